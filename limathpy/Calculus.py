@@ -1,10 +1,110 @@
 """This module contains functions to solve some calculus problems in one variable. """
 
+from collections import OrderedDict
 import sympy as sp
 import numpy as np
 import matplotlib.pyplot as plt
 
 
+class CompiledFunction:
+    """Expression parsed once, with its NumPy evaluator and its derivatives
+    compiled lazily the first time they are needed.
+
+    Args:
+        expression (str): Expression of a function, or a sympy expression.
+        variables (str, optional): Names of the variables, separated by
+        spaces. Defaults to 'x'.
+
+    Example:
+        >>> f = CompiledFunction("x**3")
+        >>> f(2.0), f.derivative()(2.0)
+        (8.0, 12.0)"""
+
+    def __init__(self, expression, variables='x'):
+        self.expr = sp.sympify(expression)
+        self.variables = tuple(sp.symbols(variables, seq=True))
+        self._numpy = None
+        self._derivatives = {}
+
+    @property
+    def numpy(self):
+        """NumPy function of the expression, compiled on first use."""
+        if self._numpy is None:
+            self._numpy = sp.lambdify(self.variables, self.expr, 'numpy')
+        return self._numpy
+
+    def __call__(self, *args):
+        return self.numpy(*args)
+
+    def derivative(self, var=None):
+        """CompiledFunction of the partial derivative with respect to var,
+        the first variable by default, computed on first use."""
+        var = self.variables[0] if var is None else sp.sympify(var)
+        if var not in self._derivatives:
+            self._derivatives[var] = CompiledFunction(
+                sp.diff(self.expr, var), ' '.join(map(str, self.variables)))
+        return self._derivatives[var]
+
+    def __str__(self):
+        return str(self.expr)
+
+
+# Distinct functions, by their canonical form, in least recently used
+# order, each with the spellings that reach it; _compiled_aliases maps
+# every spelling to its canonical form.
+_compiled_cache = OrderedDict()
+_compiled_aliases = {}
+
+
+def compiled_function(expression, variables='x', maxsize=1024):
+    """Function that returns the CompiledFunction of an expression, kept in
+    a cache of the last maxsize distinct functions so each one is parsed
+    and compiled only once.
+
+    Args:
+        expression (str): Expression of a function, or a CompiledFunction
+        that is returned as it is if it has the same variables and is
+        compiled again in the given variables otherwise.
+        variables (str, optional): Names of the variables, separated by
+        spaces. Defaults to 'x'.
+        maxsize (int, optional): Number of cached distinct functions.
+        Defaults to 1024.
+
+    Returns:
+        CompiledFunction: the cached compiled function.
+
+    Raises:
+        ValueError: if expression is a CompiledFunction that depends on
+        symbols which are not among the variables.
+
+    Example:
+        >>> compiled_function("x**2") is compiled_function("x ** 2")
+        True
+        >>> compiled_function(CompiledFunction("x*y"), 'x y').variables
+        (x, y)"""
+    if isinstance(expression, CompiledFunction):
+        symbols = tuple(sp.symbols(variables, seq=True))
+        if expression.variables == symbols:
+            return expression
+        if not expression.expr.free_symbols <= set(symbols):
+            raise ValueError(f"{expression} is not a function of {variables}")
+        expression = expression.expr
+    key = (' '.join(str(expression).split()), variables)
+    canonical = _compiled_aliases.get(key)
+    if canonical is None:
+        function = CompiledFunction(expression, variables)
+        canonical = (sp.srepr(function.expr), variables)
+        if canonical not in _compiled_cache:
+            _compiled_cache[canonical] = function, set()
+        _compiled_cache[canonical][1].add(key)
+        _compiled_aliases[key] = canonical
+    _compiled_cache.move_to_end(canonical)
+    while len(_compiled_cache) > maxsize:
+        for alias in _compiled_cache.popitem(last=False)[1][1]:
+            del _compiled_aliases[alias]
+    return _compiled_cache[canonical][0]
+
+
 def n_derivatives(expr, n=1):
     """Function that returns a list with the n derivates of an expression,
     with n given.
@@ -34,17 +134,15 @@ def graph_fyd(expression):
     on the same plane.
 
     Args: 
-        expression (str): Expression of a function.
+        expression (str): Expression of a function, or a CompiledFunction.
 
     Example:
         >>> graph_fyd("x**2")
 
     .. image:: graph_fyd.png
       :align: center"""
-    x = sp.symbols('x')
-    expr = sp.sympify(expression)
-    deriv = sp.diff(expr, x)
-    f, f_prime = sp.lambdify(x, expr, 'numpy'), sp.lambdify(x, deriv, 'numpy')
+    function = compiled_function(expression)
+    f, f_prime = function.numpy, function.derivative().numpy
     domain = np.linspace(-10, 10)
     f_eval = f(domain)
     f_prime_eval = f_prime(domain)
@@ -54,7 +152,7 @@ def graph_fyd(expression):
 
     fig, ax = plt.subplots()
     ax.set_title("Function and derivative")
-    ax.plot(domain, f_eval, label=expression)
+    ax.plot(domain, f_eval, label=str(expression))
     ax.plot(domain, f_prime_eval, label='Derivative')
     ax.set_xlabel("$x$")
     ax.legend(loc='center',
@@ -69,7 +167,7 @@ def tangent_line(expression, x_0):
     a given point.
 
     Args:
-        expression (str): Expression of a function.
+        expression (str): Expression of a function, or a CompiledFunction.
         x_0: Value of the x coordinate for the point of tangency of the line.
 
     Returns:
@@ -80,10 +178,9 @@ def tangent_line(expression, x_0):
         >>> tangent_line("x**2", 1)
         Eq(y, 2*x - 1)"""
     x, y = sp.symbols('x y')
-    expr = sp.sympify(expression)
-    y_0 = expr.subs({x: x_0})
-    deriv = sp.diff(expr, x)
-    slope = deriv.subs({x: x_0})
+    function = compiled_function(expression)
+    y_0 = function.expr.subs({x: x_0})
+    slope = function.derivative().expr.subs({x: x_0})
     line = sp.Eq(y, slope * (x - x_0) + y_0)
     return line
 
@@ -93,7 +190,7 @@ def root_f(expression, number=0):
     is zero.
 
     Args:
-        expression (str): Expression of a function.
+        expression (str): Expression of a function, or a CompiledFunction.
         number (optional): The real number at which the function is evaluated.
         Defaults to zero.
 
@@ -105,7 +202,7 @@ def root_f(expression, number=0):
         >>> root_f("x**2", 0)
         True"""
     x = sp.symbols('x')
-    expr = sp.sympify(expression)
+    expr = compiled_function(expression).expr
     return expr.subs({x: number}) == 0
 
 
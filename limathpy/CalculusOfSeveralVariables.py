@@ -1,5 +1,47 @@
 # my file of the calculus of several variables
+from functools import lru_cache, reduce
+import operator
+import numpy as np
 import sympy as sp
+from scipy import sparse
+
+
+@lru_cache(maxsize=65536)
+def _partial(expr, variables):
+    if not variables:
+        return expr
+    return sp.diff(_partial(expr, variables[:-1]), variables[-1])
+
+
+def cached_partial(expr, *variables):
+    """Function that returns the partial derivative of an expression with
+       respect to a multiset of variables, keeping every derivative it
+       computes in a cache shared by all the functions of this module.
+
+       The variables are sorted, so mixed partials are computed once, and
+       each derivative is obtained from the cached one of lower order.
+
+    Args:
+        expr: Any sympy function.
+        variables: Variables with respect to which it is derived, repeated
+        for higher order derivatives.
+
+    Returns:
+        The sympy expression of the partial derivative.
+
+    Example:
+        >>> from sympy import symbols
+        >>> x = symbols('x')
+        >>> y = symbols('y')
+        >>> cached_partial(x**3*y**2, x, y, x)
+        12*x*y"""
+    variables = tuple(sorted(variables, key=sp.default_sort_key))
+    return _partial(sp.sympify(expr), variables)
+
+
+def clear_derivative_cache():
+    """Function that empties the cache of cached_partial."""
+    _partial.cache_clear()
 
 
 def partial_derivate(expr, var):
@@ -23,7 +65,7 @@ def partial_derivate(expr, var):
     x = sp.symbols('x')
     y = sp.symbols('y')
     z = sp.symbols('z')
-    partial = sp.diff(expr, var)
+    partial = cached_partial(expr, var)
     return partial
 
 
@@ -51,7 +93,7 @@ def gradient(expr, var):
     z = sp.symbols('z')
     gradient = [expr]
     for i in range(len(var)):
-        gradient.append(sp.diff(gradient[0], var[i]))
+        gradient.append(cached_partial(gradient[0], var[i]))
     return gradient
 
 
@@ -85,10 +127,68 @@ def jacobian(function, var):
     mat = sp.zeros(m, n)
     for i in range(m):
         for j in range(n):
-            mat[i, j] = sp.diff(function[i], var[j])
+            mat[i, j] = cached_partial(function[i], var[j])
     return mat
 
 
+def jacobian_function(function, var):
+    """Function that returns the sparsity pattern of the Jacobian matrix of
+       the given coordinate functions and a NumPy function that evaluates
+       its nonzero entries at many points at once.
+
+       Only the variables that appear in each coordinate function are
+       derived, and the entries are compiled with common subexpression
+       elimination.
+
+    Args:
+        function: Any list of sympy functions.
+        var: List of variables in order.
+
+    Returns:
+        tuple: a scipy.sparse csr matrix with ones at the structurally
+        nonzero entries, and a function that takes an array of points of
+        shape (N, len(var)) and returns the array of shape (N, nnz) with
+        the values of those entries in the order of the csr data.
+
+    Example:
+        >>> import numpy as np
+        >>> from sympy import symbols
+        >>> x = symbols('x')
+        >>> y = symbols('y')
+        >>> z = symbols('z')
+        >>> pattern, J = jacobian_function([x*y, y**2 + z, 3*z], [x, y, z])
+        >>> pattern.toarray()
+        array([[1, 1, 0],
+               [0, 1, 1],
+               [0, 0, 1]])
+        >>> J(np.array([[1., 2., 3.]]))
+        array([[2., 1., 4., 1., 3.]])"""
+    position = {v: j for j, v in enumerate(var)}
+    indptr = [0]
+    indices = []
+    entries = []
+    for f in function:
+        f = sp.sympify(f)
+        cols = sorted(position[v] for v in f.free_symbols if v in position)
+        for j in cols:
+            partial = cached_partial(f, var[j])
+            if partial != 0:
+                indices.append(j)
+                entries.append(partial)
+        indptr.append(len(indices))
+    pattern = sparse.csr_matrix((np.ones(len(indices), dtype=int), indices,
+                                 indptr), shape=(len(function), len(var)))
+    f = sp.lambdify(var, entries, 'numpy', cse=True)
+
+    def evaluate(points):
+        points = np.asarray(points, dtype=float)
+        values = np.empty(shape=(points.shape[0], len(entries)), dtype=float)
+        for k, value in enumerate(f(*points.T)):
+            values[:, k] = value
+        return values
+    return pattern, evaluate
+
+
 def hessian(function, var):
     """Function that returns a matrix that represents the Hessian
        matrix of the given coordinate functions.
@@ -119,11 +219,85 @@ def hessian(function, var):
     mat = sp.zeros(m, n)
     for i in range(m):
         for j in range(n):
-            jacb = sp.diff(function[i], var[j])
-            mat[i, j] = sp.diff(jacb, var[j])
+            mat[i, j] = cached_partial(function[i], var[j], var[j])
+    return mat
+
+
+def hessian_matrix(expr, var):
+    """Function that returns the Hessian matrix of a scalar function,
+       with all its mixed second partial derivatives.
+
+       Only the upper triangle is derived, the lower one is its mirror.
+
+    Args:
+        expr: Any sympy function.
+        var: List of variables in order.
+
+    Returns:
+        Matrix: the symmetric Hessian matrix.
+
+    Example:
+        >>> from sympy import symbols
+        >>> x = symbols('x')
+        >>> y = symbols('y')
+        >>> hessian_matrix(x**2*y + sp.sin(y), [x, y])
+        Matrix([
+        [2*y,     2*x],
+        [2*x, -sin(y)]])
+    """
+    n = len(var)
+    mat = sp.zeros(n, n)
+    for i in range(n):
+        for j in range(i, n):
+            mat[i, j] = cached_partial(expr, var[i], var[j])
+            mat[j, i] = mat[i, j]
     return mat
 
 
+def hessian_function(expr, var):
+    """Function that returns a NumPy function that evaluates the Hessian
+       matrix of a scalar function at many points at once.
+
+       The upper triangle of the Hessian is compiled with common
+       subexpression elimination and mirrored at evaluation.
+
+    Args:
+        expr: Any sympy function.
+        var: List of variables in order.
+
+    Returns:
+        function: that takes an array of points of shape (N, len(var)) and
+        returns the array of shape (N, len(var), len(var)) with the Hessian
+        at every point.
+
+    Example:
+        >>> import numpy as np
+        >>> from sympy import symbols
+        >>> x = symbols('x')
+        >>> y = symbols('y')
+        >>> H = hessian_function(x**2*y + y, [x, y])
+        >>> H(np.array([[1., 2.], [0., 1.]]))
+        array([[[4., 2.],
+                [2., 0.]],
+        <BLANKLINE>
+               [[2., 0.],
+                [0., 0.]]])"""
+    n = len(var)
+    rows, cols = np.triu_indices(n)
+    upper = [cached_partial(expr, var[i], var[j]) for i, j in zip(rows, cols)]
+    f = sp.lambdify(var, upper, 'numpy', cse=True)
+
+    def evaluate(points):
+        points = np.asarray(points, dtype=float)
+        values = f(*points.T)
+        mat = np.empty(shape=(points.shape[0], n, n), dtype=float)
+        for value, i, j in zip(values, rows, cols):
+            mat[:, i, j] = value
+            mat[:, j, i] = value
+        return mat
+    return evaluate
+
+
 def divergence(expr, var):
     """Function that returns the Divergence of a given vector field.
     
@@ -147,7 +321,7 @@ def divergence(expr, var):
     partials = [0]*n
     divergence = 0
     for i in range(n):
-        partials[i] = sp.diff(expr[i], var[i])
+        partials[i] = cached_partial(expr[i], var[i])
         divergence = divergence + partials[i]
     return divergence
 
@@ -174,11 +348,567 @@ def laplacian(expr, var):
     y = sp.symbols('y')
     z = sp.symbols('z')
     n = len(var)
-    partial1 = [0]*n
     partial2 = [0]*n
     laplacian = 0
     for i in range(n):
-        partial1[i] = sp.diff(expr, var[i])
-        partial2[i] = sp.diff(partial1[i], var[i])
+        partial2[i] = cached_partial(expr, var[i], var[i])
         laplacian = laplacian + partial2[i]
     return laplacian
+
+
+def _field_function(exprs, var):
+    """NumPy function that evaluates a list of expressions on broadcast
+    grids, stacking the results in a single array."""
+    f = sp.lambdify(var, exprs, 'numpy', cse=True)
+
+    def evaluate(*grids):
+        grids = [np.asarray(grid, dtype=float) for grid in grids]
+        shape = np.broadcast_shapes(*[grid.shape for grid in grids])
+        values = np.empty(shape=(len(exprs),) + shape, dtype=float)
+        for k, value in enumerate(f(*grids)):
+            values[k] = value
+        return values
+    return evaluate
+
+
+def gradient_function(expr, var):
+    """Function that returns a NumPy function that evaluates the gradient
+       of the given function over grids, such as the ones of np.meshgrid.
+
+       All the components are compiled together with common subexpression
+       elimination, and constant components are broadcast to the grid.
+
+    Args:
+        expr: Any sympy function.
+        var: List of variables in order.
+
+    Returns:
+        function: that takes one grid per variable and returns the array
+        of shape (len(var),) + grid shape with the components of the
+        gradient.
+
+    Example:
+        >>> import numpy as np
+        >>> from sympy import symbols
+        >>> x = symbols('x')
+        >>> y = symbols('y')
+        >>> X, Y = np.meshgrid([0., 1.], [0., 2.])
+        >>> gradient_function(x**2 + 3*y, [x, y])(X, Y)
+        array([[[0., 2.],
+                [0., 2.]],
+        <BLANKLINE>
+               [[3., 3.],
+                [3., 3.]]])"""
+    return _field_function([cached_partial(expr, v) for v in var], var)
+
+
+def divergence_function(expr, var):
+    """Function that returns a NumPy function that evaluates the Divergence
+       of a given vector field over grids, such as the ones of np.meshgrid.
+
+    Args:
+        expr: Any list of sympy functions.
+        var: List of variables in order.
+
+    Returns:
+        function: that takes one grid per variable and returns the array
+        with the divergence at every point of the grid.
+
+    Example:
+        >>> import numpy as np
+        >>> from sympy import symbols
+        >>> x = symbols('x')
+        >>> y = symbols('y')
+        >>> X, Y = np.meshgrid([0., 1.], [0., 2.])
+        >>> divergence_function([x*y, y], [x, y])(X, Y)
+        array([[1., 1.],
+               [3., 3.]])"""
+    div = sum(cached_partial(expr[i], var[i]) for i in range(len(expr)))
+    field = _field_function([div], var)
+    return lambda *grids: field(*grids)[0]
+
+
+def laplacian_function(expr, var):
+    """Function that returns a NumPy function that evaluates the Laplacian
+       of a function of several variables over grids, such as the ones of
+       np.meshgrid.
+
+    Args:
+        expr: Any sympy function.
+        var: List of variables in order.
+
+    Returns:
+        function: that takes one grid per variable and returns the array
+        with the Laplacian at every point of the grid.
+
+    Example:
+        >>> import numpy as np
+        >>> from sympy import symbols
+        >>> x = symbols('x')
+        >>> y = symbols('y')
+        >>> X, Y = np.meshgrid([0., 1.], [0., 2.])
+        >>> laplacian_function(x**2 + y**3, [x, y])(X, Y)
+        array([[ 2.,  2.],
+               [14., 14.]])"""
+    lap = sum(cached_partial(expr, v, v) for v in var)
+    field = _field_function([lap], var)
+    return lambda *grids: field(*grids)[0]
+
+
+#Finite differences for fields sampled on grids.
+
+_CENTRAL = {(1, 2): {-1: -1/2, 1: 1/2},
+            (1, 4): {-2: 1/12, -1: -2/3, 1: 2/3, 2: -1/12},
+            (2, 2): {-1: 1, 0: -2, 1: 1},
+            (2, 4): {-2: -1/12, -1: 4/3, 0: -5/2, 1: 4/3, 2: -1/12}}
+_FORWARD = {1: {0: -3/2, 1: 2, 2: -1/2},
+            2: {0: 2, 1: -5, 2: 4, 3: -1}}
+_BOUNDARIES = ('one-sided', 'periodic', 'zero')
+
+
+def _edge_stencil(i, n, deriv, order, boundary):
+    """Coefficients {index: coefficient} of the difference at the point i
+    of an axis of n points, where the central stencil does not fit."""
+    if boundary == 'periodic':
+        stencil = {}
+        for k, c in _CENTRAL[deriv, order].items():
+            stencil[(i + k) % n] = stencil.get((i + k) % n, 0) + c
+        return stencil
+    if boundary == 'zero':
+        return {i + k: c for k, c in _CENTRAL[deriv, order].items()
+                if 0 <= i + k < n}
+    if i == 0:
+        return {k: c for k, c in _FORWARD[deriv].items()}
+    if i == n - 1:
+        sign = (-1)**deriv
+        return {n - 1 - k: sign*c for k, c in _FORWARD[deriv].items()}
+    return {i + k: c for k, c in _CENTRAL[deriv, 2].items()}
+
+
+def _check_grid(n, order, boundary):
+    if (1, order) not in _CENTRAL:
+        raise ValueError("order must be 2 or 4")
+    if boundary not in _BOUNDARIES:
+        raise ValueError(f"boundary must be one of {_BOUNDARIES}")
+    if n < order + 2:
+        raise ValueError(f"every axis needs at least {order + 2} points")
+
+
+def _spacings(spacing, ndim):
+    spacing = np.broadcast_to(np.asarray(spacing, dtype=float), (ndim,))
+    return [float(h) for h in spacing]
+
+
+def _difference(field, h, axis, deriv, order, boundary, out):
+    """Writes in out the deriv-th derivative of field along axis, without
+    temporaries of the size of field."""
+    n = field.shape[axis]
+    _check_grid(n, order, boundary)
+    f = np.moveaxis(field, axis, 0)
+    o = np.moveaxis(out, axis, 0)
+    r = order//2
+    inner = o[r:n - r]
+    if deriv == 1 and order == 2:
+        np.subtract(f[2:], f[:-2], out=inner)
+        inner *= 1/2
+    elif deriv == 1:
+        np.subtract(f[3:-1], f[1:-3], out=inner)
+        inner *= 8
+        inner -= f[4:]
+        inner += f[:-4]
+        inner *= 1/12
+    elif order == 2:
+        np.add(f[2:], f[:-2], out=inner)
+        inner -= f[1:-1]
+        inner -= f[1:-1]
+    else:
+        np.add(f[3:-1], f[1:-3], out=inner)
+        inner *= 16
+        inner -= f[4:]
+        inner -= f[:-4]
+        inner *= 1/30
+        inner -= f[2:-2]
+        inner *= 30/12
+    for i in list(range(r)) + list(range(n - r, n)):
+        o[i] = 0
+        for j, c in _edge_stencil(i, n, deriv, order, boundary).items():
+            o[i] += c*f[j]
+    out *= 1/h**deriv
+    return out
+
+
+def grid_gradient(field, spacing=1, order=2, boundary='one-sided'):
+    """Function that returns the gradient of a field sampled on a grid,
+       with central finite differences.
+
+    Args:
+        field: NumPy array with the values of the field on the grid.
+        spacing (optional): distance between the points of the grid, one
+        number or one per axis. Defaults to 1.
+        order (int, optional): order of the central differences, 2 or 4.
+        Defaults to 2.
+        boundary (str, optional): 'one-sided' differences of second order
+        at the boundary, 'periodic' field or 'zero' field outside the grid.
+        Defaults to 'one-sided'.
+
+    Returns:
+        array: of shape (field.ndim,) + field.shape with the components of
+        the gradient.
+
+    Example:
+        >>> import numpy as np
+        >>> grid_gradient(np.array([0., 1., 4., 9., 16.]), 1)
+        array([[0., 2., 4., 6., 8.]])"""
+    field = np.asarray(field, dtype=float)
+    spacing = _spacings(spacing, field.ndim)
+    grad = np.empty(shape=(field.ndim,) + field.shape, dtype=float)
+    for axis in range(field.ndim):
+        _difference(field, spacing[axis], axis, 1, order, boundary, grad[axis])
+    return grad
+
+
+def grid_divergence(expr, spacing=1, order=2, boundary='one-sided'):
+    """Function that returns the Divergence of a vector field sampled on a
+       grid, with central finite differences.
+
+    Args:
+        expr: list of NumPy arrays, or one array with the components along
+        its first axis, with the values of the field on the grid.
+        spacing (optional): distance between the points of the grid, one
+        number or one per axis. Defaults to 1.
+        order (int, optional): order of the central differences, 2 or 4.
+        Defaults to 2.
+        boundary (str, optional): 'one-sided', 'periodic' or 'zero', as in
+        grid_gradient. Defaults to 'one-sided'.
+
+    Returns:
+        array: with the divergence at every point of the grid.
+
+    Example:
+        >>> import numpy as np
+        >>> X, Y = np.meshgrid(np.arange(5.), np.arange(5.), indexing='ij')
+        >>> grid_divergence([X**2, Y], 1)[2]
+        array([5., 5., 5., 5., 5.])"""
+    components = [np.asarray(component, dtype=float) for component in expr]
+    spacing = _spacings(spacing, len(components))
+    div = np.empty_like(components[0])
+    buffer = np.empty_like(div) if len(components) > 1 else None
+    _difference(components[0], spacing[0], 0, 1, order, boundary, div)
+    for axis in range(1, len(components)):
+        div += _difference(components[axis], spacing[axis], axis, 1, order,
+                           boundary, buffer)
+    return div
+
+
+def grid_laplacian(expr, spacing=1, order=2, boundary='one-sided'):
+    """Function that returns the Laplacian of a field sampled on a grid,
+       with central finite differences.
+
+    Args:
+        expr: NumPy array with the values of the field on the grid.
+        spacing (optional): distance between the points of the grid, one
+        number or one per axis. Defaults to 1.
+        order (int, optional): order of the central differences, 2 or 4.
+        Defaults to 2.
+        boundary (str, optional): 'one-sided', 'periodic' or 'zero', as in
+        grid_gradient. Defaults to 'one-sided'.
+
+    Returns:
+        array: with the Laplacian at every point of the grid.
+
+    Example:
+        >>> import numpy as np
+        >>> X, Y = np.meshgrid(np.arange(5.), np.arange(5.), indexing='ij')
+        >>> grid_laplacian(X**2 + Y**3, 1)[2]
+        array([ 2.,  8., 14., 20., 26.])"""
+    field = np.asarray(expr, dtype=float)
+    spacing = _spacings(spacing, field.ndim)
+    lap = np.empty_like(field)
+    buffer = np.empty_like(field) if field.ndim > 1 else None
+    _difference(field, spacing[0], 0, 2, order, boundary, lap)
+    for axis in range(1, field.ndim):
+        lap += _difference(field, spacing[axis], axis, 2, order, boundary,
+                           buffer)
+    return lap
+
+
+def laplacian_matrix(shape, spacing=1, order=2, boundary='zero'):
+    """Function that returns the sparse matrix of the finite difference
+       Laplacian on a grid, to be reused for many fields or solves.
+
+       The matrix acts on fields flattened in C order, so
+       laplacian_matrix(f.shape) @ f.ravel() is grid_laplacian(f).ravel()
+       for the same spacing, order and boundary.
+
+    Args:
+        shape (tuple): number of points of the grid along each axis.
+        spacing (optional): distance between the points of the grid, one
+        number or one per axis. Defaults to 1.
+        order (int, optional): order of the central differences, 2 or 4.
+        Defaults to 2.
+        boundary (str, optional): 'one-sided', 'periodic' or 'zero', as in
+        grid_gradient. Defaults to 'zero'.
+
+    Returns:
+        scipy.sparse.csr_matrix: of size prod(shape) x prod(shape).
+
+    Example:
+        >>> laplacian_matrix((4,)).toarray()
+        array([[-2.,  1.,  0.,  0.],
+               [ 1., -2.,  1.,  0.],
+               [ 0.,  1., -2.,  1.],
+               [ 0.,  0.,  1., -2.]])"""
+    shape = tuple(shape)
+    spacing = _spacings(spacing, len(shape))
+    size = int(np.prod(shape))
+    lap = sparse.csr_matrix((size, size), dtype=float)
+    for axis, n in enumerate(shape):
+        _check_grid(n, order, boundary)
+        r = order//2
+        rows, cols, vals = [], [], []
+        for i in range(n):
+            if r <= i < n - r:
+                stencil = {i + k: c for k, c in _CENTRAL[2, order].items()}
+            else:
+                stencil = _edge_stencil(i, n, 2, order, boundary)
+            for j, c in stencil.items():
+                rows.append(i)
+                cols.append(j)
+                vals.append(c/spacing[axis]**2)
+        second = sparse.csr_matrix((vals, (rows, cols)), shape=(n, n))
+        before = sparse.identity(int(np.prod(shape[:axis])), format='csr')
+        after = sparse.identity(int(np.prod(shape[axis + 1:])), format='csr')
+        lap = lap + sparse.kron(sparse.kron(before, second), after,
+                                format='csr')
+    return lap
+
+
+#Automatic differentiation on a NumPy evaluation graph of sympy expressions.
+
+_AD_FUNCTIONS = {
+    sp.sin: (np.sin, lambda x, v: np.cos(x)),
+    sp.cos: (np.cos, lambda x, v: -np.sin(x)),
+    sp.tan: (np.tan, lambda x, v: 1 + v*v),
+    sp.exp: (np.exp, lambda x, v: v),
+    sp.log: (np.log, lambda x, v: 1/x),
+    sp.asin: (np.arcsin, lambda x, v: 1/np.sqrt(1 - x*x)),
+    sp.acos: (np.arccos, lambda x, v: -1/np.sqrt(1 - x*x)),
+    sp.atan: (np.arctan, lambda x, v: 1/(1 + x*x)),
+    sp.sinh: (np.sinh, lambda x, v: np.cosh(x)),
+    sp.cosh: (np.cosh, lambda x, v: np.sinh(x)),
+    sp.tanh: (np.tanh, lambda x, v: 1 - v*v),
+    sp.Abs: (np.abs, lambda x, v: np.sign(x)),
+}
+
+
+class ExpressionGraph:
+    """Sympy expressions compiled once to a graph of NumPy operations, that
+    evaluates them and their derivatives by automatic differentiation at
+    many points at once.
+
+    Every distinct subexpression is a node of the graph, so the cost of a
+    derivative is a small multiple of the cost of evaluating the
+    expressions, whatever the size of their symbolic derivatives.
+
+    Args:
+        function: Any sympy function or list of sympy functions.
+        var: List of variables in order.
+
+    Raises:
+        ValueError: the expressions use a function without a NumPy
+        counterpart in the graph.
+
+    Example:
+        >>> import numpy as np
+        >>> from sympy import symbols
+        >>> x = symbols('x')
+        >>> y = symbols('y')
+        >>> graph = ExpressionGraph(x*sp.sin(y) + x**2, [x, y])
+        >>> graph.gradient(np.array([[1., 0.], [2., 0.]]))
+        array([[2., 1.],
+               [4., 2.]])
+        >>> graph = ExpressionGraph([3*x*y**2, 2*x + y], [x, y])
+        >>> points = np.array([[1., 2.], [2., 1.]])
+        >>> graph.evaluate(points)
+        array([[12.,  4.],
+               [ 6.,  5.]])
+        >>> graph.gradient(points)
+        array([[12., 12.],
+               [ 3., 12.]])
+        >>> graph.jacobian(points)
+        array([[[12., 12.],
+                [ 2.,  1.]],
+        <BLANKLINE>
+               [[ 3., 12.],
+                [ 2.,  1.]]])
+        >>> np.array_equal(graph.jacobian(points, 'forward'), graph.jacobian(points))
+        True
+    """
+
+    def __init__(self, function, var):
+        self.var = list(var)
+        functions = function if isinstance(function, (list, tuple)) \
+            else [function]
+        self.nodes = []
+        self._index = {v: self._add(('var', j)) for j, v in enumerate(var)}
+        self.outputs = [self._build(sp.sympify(f)) for f in functions]
+
+    def _add(self, node):
+        self.nodes.append(node)
+        return len(self.nodes) - 1
+
+    def _build(self, expr):
+        if expr in self._index:
+            return self._index[expr]
+        if expr.is_Number or (expr.is_Atom and not expr.free_symbols):
+            node = ('const', float(expr))
+        elif expr.is_Symbol:
+            raise ValueError(f"{expr} is not one of the variables")
+        elif expr.is_Add or expr.is_Mul:
+            kind = 'add' if expr.is_Add else 'mul'
+            node = (kind, [self._build(arg) for arg in expr.args])
+        elif expr.is_Pow:
+            base, exponent = expr.args
+            if exponent.is_Number:
+                node = ('powc', self._build(base), float(exponent))
+            else:
+                node = ('pow', self._build(base), self._build(exponent))
+        elif expr.func in _AD_FUNCTIONS and len(expr.args) == 1:
+            node = (expr.func, self._build(expr.args[0]))
+        else:
+            raise ValueError(f"{expr.func} is not supported by ExpressionGraph")
+        self._index[expr] = self._add(node)
+        return self._index[expr]
+
+    def _forward(self, points, tangents=None):
+        points = np.asarray(points, dtype=float)
+        values = []
+        dots = [] if tangents is not None else None
+        for node in self.nodes:
+            kind = node[0]
+            if kind == 'var':
+                value = points[:, node[1]]
+                dot = None if dots is None else tangents[:, node[1]]
+            elif kind == 'const':
+                value, dot = node[1], 0.0
+            elif kind == 'add':
+                value = sum(values[i] for i in node[1])
+                dot = None if dots is None else sum(dots[i] for i in node[1])
+            elif kind == 'mul':
+                value = reduce(operator.mul, [values[i] for i in node[1]])
+                if dots is not None:
+                    dot = sum(dots[i]*others for i, others in
+                              zip(node[1], self._others(values, node[1])))
+            elif kind == 'powc':
+                base, exponent = values[node[1]], node[2]
+                value = base**exponent
+                if dots is not None:
+                    dot = exponent*base**(exponent - 1)*dots[node[1]]
+            elif kind == 'pow':
+                base, exponent = values[node[1]], values[node[2]]
+                value = base**exponent
+                if dots is not None:
+                    dot = value*(dots[node[2]]*np.log(base) +
+                                 exponent*dots[node[1]]/base)
+            else:
+                f, df = _AD_FUNCTIONS[kind]
+                value = f(values[node[1]])
+                if dots is not None:
+                    dot = df(values[node[1]], value)*dots[node[1]]
+            values.append(value)
+            if dots is not None:
+                dots.append(dot)
+        return values, dots
+
+    @staticmethod
+    def _others(values, args):
+        """Products of all the factors but one, without divisions."""
+        prefix = [1.0]
+        for i in args[:-1]:
+            prefix.append(prefix[-1]*values[i])
+        suffix = [1.0]
+        for i in reversed(args[1:]):
+            suffix.append(suffix[-1]*values[i])
+        return [p*q for p, q in zip(prefix, reversed(suffix))]
+
+    def _broadcast(self, values, n):
+        return np.stack([np.broadcast_to(values[i], (n,)) for i in self.outputs],
+                        axis=1)
+
+    def evaluate(self, points):
+        """Values of the functions at an array of points (N, len(var)),
+        as an array (N, number of functions)."""
+        points = np.asarray(points, dtype=float)
+        return self._broadcast(self._forward(points)[0], points.shape[0])
+
+    def jvp(self, points, tangents):
+        """Forward mode: Jacobian-vector products at an array of points
+        (N, len(var)) with tangent vectors of the same shape, as an array
+        (N, number of functions)."""
+        points = np.asarray(points, dtype=float)
+        tangents = np.broadcast_to(np.asarray(tangents, dtype=float),
+                                   points.shape)
+        return self._broadcast(self._forward(points, tangents)[1],
+                               points.shape[0])
+
+    def vjp(self, points, cotangents):
+        """Reverse mode: vector-Jacobian products at an array of points
+        (N, len(var)) with cotangents (N, number of functions), as an array
+        (N, len(var))."""
+        points = np.asarray(points, dtype=float)
+        n = points.shape[0]
+        cotangents = np.broadcast_to(np.asarray(cotangents, dtype=float),
+                                     (n, len(self.outputs)))
+        values = self._forward(points)[0]
+        adjoints = [None]*len(self.nodes)
+        for k, i in enumerate(self.outputs):
+            adjoints[i] = cotangents[:, k] if adjoints[i] is None \
+                else adjoints[i] + cotangents[:, k]
+        grad = np.zeros(shape=(n, len(self.var)), dtype=float)
+
+        def push(i, adjoint):
+            adjoints[i] = adjoint if adjoints[i] is None \
+                else adjoints[i] + adjoint
+        for i in reversed(range(len(self.nodes))):
+            adjoint = adjoints[i]
+            if adjoint is None:
+                continue
+            node = self.nodes[i]
+            kind = node[0]
+            if kind == 'var':
+                grad[:, node[1]] += adjoint
+            elif kind == 'add':
+                for j in node[1]:
+                    push(j, adjoint)
+            elif kind == 'mul':
+                for j, others in zip(node[1], self._others(values, node[1])):
+                    push(j, adjoint*others)
+            elif kind == 'powc':
+                base, exponent = values[node[1]], node[2]
+                push(node[1], adjoint*exponent*base**(exponent - 1))
+            elif kind == 'pow':
+                base, exponent = values[node[1]], values[node[2]]
+                push(node[1], adjoint*exponent*values[i]/base)
+                push(node[2], adjoint*values[i]*np.log(base))
+            elif kind != 'const':
+                push(node[1], adjoint*_AD_FUNCTIONS[kind][1](values[node[1]],
+                                                              values[i]))
+        return grad
+
+    def gradient(self, points):
+        """Reverse mode gradient of the first function at an array of
+        points (N, len(var)), as an array (N, len(var))."""
+        cotangents = np.zeros(len(self.outputs))
+        cotangents[0] = 1
+        return self.vjp(points, cotangents)
+
+    def jacobian(self, points, mode='reverse'):
+        """Jacobian of the functions at an array of points (N, len(var)),
+        as an array (N, number of functions, len(var)), with one reverse
+        pass per function or one forward pass per variable."""
+        points = np.asarray(points, dtype=float)
+        if mode == 'forward':
+            return np.stack([self.jvp(points, direction)
+                             for direction in np.eye(len(self.var))], axis=2)
+        return np.stack([self.vjp(points, cotangent)
+                         for cotangent in np.eye(len(self.outputs))], axis=1)
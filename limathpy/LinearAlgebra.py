@@ -1,18 +1,171 @@
 """This is the Linear Algebra module. He we have some useful functions."""
 
 
+import math
+import warnings
+from collections import OrderedDict
 import sympy as sp
 import numpy as np
 import matplotlib.pyplot as plt 
 from scipy import linalg
+from scipy import sparse
+from scipy.sparse import linalg as sparse_linalg
 
 
-def matrix_n(matriz, n):
+BACKENDS = ('sympy', 'integer', 'numpy', 'sparse')
+
+
+def _matrix_kind(matrix):
+    """Backend that matches the type of a matrix, without looking at its
+    entries."""
+    if isinstance(matrix, sp.MatrixBase):
+        return 'sympy'
+    if sparse.issparse(matrix):
+        return 'sparse'
+    if np.asarray(matrix).dtype == object:
+        return 'integer'
+    return 'numpy'
+
+
+def matrix_backend(matrix):
+    """Cheapest backend for a matrix, exact for sympy matrices.
+
+    Sympy matrices with symbols or non-integer rationals need 'sympy', with
+    integer entries they use 'integer' (NumPy arrays of Python integers)
+    and with only floating point entries 'numpy'. NumPy arrays use 'numpy'
+    and scipy.sparse matrices 'sparse'. Integer NumPy arrays keep their
+    fixed-width dtype, whose arithmetic wraps around on overflow;
+    matrix_power and matrix_n move them to 'integer' when their powers may
+    overflow, and to_backend(matrix, 'integer') does it explicitly.
+
+    Args:
+        matrix: sympy Matrix, NumPy array or scipy.sparse matrix.
+
+    Returns:
+        string: one of 'sympy', 'integer', 'numpy' or 'sparse'.
+
+    Examples:
+        >>> import sympy as sp
+        >>> matrix_backend(sp.Matrix([[1, 2], [3, 4]]))
+        'integer'
+        >>> matrix_backend(sp.Matrix([[1, 2], [3, 4]])/2)
+        'sympy'
+        >>> import numpy as np
+        >>> matrix_backend(np.array([[1, 2], [3, 4]]))
+        'numpy'
+    """
+    kind = _matrix_kind(matrix)
+    if kind == 'sympy':
+        entries = list(matrix)
+        if all(isinstance(entry, sp.Integer) for entry in entries):
+            return 'integer'
+        if entries and all(isinstance(entry, sp.Float) for entry in entries):
+            return 'numpy'
+    elif kind == 'integer' and not all(isinstance(entry, (int, np.integer))
+                                       for entry in np.ravel(matrix)):
+        return 'sympy'
+    return kind
+
+
+def _common_backend(*matrices):
+    """Cheapest backend that computes exactly with all the matrices."""
+    backends = {matrix_backend(matrix) for matrix in matrices}
+    if 'sympy' in backends:
+        return 'sympy'
+    if backends == {'integer'}:
+        return 'integer'
+    if 'sparse' in backends:
+        return 'sparse'
+    return 'numpy'
+
+
+def _common_kind(*matrices):
+    """Backend that matches the types of all the matrices."""
+    kinds = {_matrix_kind(matrix) for matrix in matrices}
+    for kind in ('sympy', 'integer', 'sparse'):
+        if kind in kinds:
+            return kind
+    return 'numpy'
+
+
+def to_backend(matrix, backend):
+    """Conversion of a matrix to the type of a backend.
+
+    Args:
+        matrix: sympy Matrix, NumPy array or scipy.sparse matrix.
+        backend (string): 'sympy', 'integer', 'numpy' or 'sparse'.
+
+    Returns:
+        A sympy Matrix, a NumPy array of Python integers, a NumPy array or a
+        scipy.sparse matrix, according to the backend.
+
+    Raises:
+        ValueError: unknown backend, or 'integer' for a matrix with
+        non-integer entries.
+
+    Examples:
+        >>> import numpy as np
+        >>> to_backend(np.array([[1, 2], [3, 4]]), 'sympy')
+        Matrix([
+        [1, 2],
+        [3, 4]])
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"backend must be one of {BACKENDS}")
+    kind = _matrix_kind(matrix)
+    if kind == backend:
+        return matrix
+    if kind == 'sparse':
+        matrix = matrix.toarray()
+    if backend == 'sympy':
+        return sp.Matrix(np.asarray(matrix).tolist())
+    if backend == 'sparse':
+        return sparse.csr_matrix(to_backend(matrix, 'numpy'))
+    if backend == 'numpy':
+        if kind == 'sympy':
+            return np.array(matrix.tolist(), dtype=float)
+        return np.array(np.asarray(matrix).tolist())
+    if kind == 'numpy' and np.asarray(matrix).dtype.kind in 'iu':
+        return np.asarray(matrix).astype(object)
+    entries = np.asarray(matrix.tolist() if kind == 'sympy' else matrix,
+                         dtype=object)
+    array = np.empty(entries.shape, dtype=object)
+    for index, entry in np.ndenumerate(entries):
+        try:
+            array[index] = int(entry)
+        except TypeError:
+            array[index] = None
+        if array[index] is None or array[index] != entry:
+            raise ValueError("the 'integer' backend needs integer entries")
+    return array
+
+
+def _power_backend(matriz, n):
+    """matrix_backend, with integer NumPy arrays moved to 'integer' when
+    their powers up to n may overflow their fixed-width entries."""
+    backend = matrix_backend(matriz)
+    array = np.asarray(matriz) if backend == 'numpy' else None
+    if array is not None and array.dtype.kind in 'iu' and array.size and n > 1:
+        # Every entry of A**n is bounded by (k*max|a_ij|)**n for A (k, k).
+        bound = array.shape[-1]*max(abs(int(array.max())), abs(int(array.min())))
+        if bound > 1 and n*math.log2(bound) >= np.iinfo(array.dtype).bits - 1:
+            return 'integer'
+    return backend
+
+
+def matrix_n(matriz, n, backend=None):
     """Powers of a matrix.
 
+    Every power is the product of the previous one and the matrix, computed
+    with the backend given by matrix_backend. Integer NumPy arrays whose
+    powers may overflow their dtype are computed with Python integers.
+
     Args:
-        matriz: matrix of sympy
+        matriz: matrix of sympy, NumPy array or scipy.sparse matrix
         n (int): the power.
+        backend (string, optional): backend used to compute and to return
+        the powers. Defaults to the cheapest one, returning the powers with
+        the type of matriz.
         
     Returns:
         list: List of n powers of a given matrix.
@@ -25,9 +178,71 @@ def matrix_n(matriz, n):
         [3, 4]]), Matrix([
         [ 7, 10],
         [15, 22]])]
+        >>> import numpy as np
+        >>> matrix_n(np.array([[1, 1], [1, 0]]), 95)[-1][0, 0]
+        51680708854858323072
+    """
+    target = backend or _matrix_kind(matriz)
+    base = to_backend(matriz, backend or _power_backend(matriz, n))
+    pot_matriz = [base] if n >= 1 else []
+    for i in range(1, n):
+        pot_matriz.append(pot_matriz[-1] @ base)
+    return [to_backend(pot, target) for pot in pot_matriz]
+
+
+def matrix_power(matriz, n, backend=None):
+    """Power of a matrix by repeated squaring.
+
+    Integer NumPy arrays whose power may overflow their dtype are computed
+    with Python integers.
+
+    Args:
+        matriz: square matrix of sympy, NumPy array or scipy.sparse matrix
+        n (int): the power, non negative for the 'integer' and 'sparse'
+        backends.
+        backend (string, optional): backend used to compute and to return
+        the power. Defaults to the cheapest one, returning the power with
+        the type of matriz.
+
+    Returns:
+        The n-th power of the matrix.
+
+    Raises:
+        ValueError: if n is negative with the 'sparse' backend, whose
+        inverse is generally dense.
+
+    Examples:
+        >>> import sympy as sp
+        >>> matrix_power(sp.Matrix([[1, 1], [1, 0]]), 90)
+        Matrix([
+        [4660046610375530309, 2880067194370816120],
+        [2880067194370816120, 1779979416004714189]])
+        >>> import numpy as np
+        >>> matrix_power(np.array([[1, 1], [1, 0]]), 100)[0, 0]
+        573147844013817084101
     """
-    pot_matriz = [matriz**i for i in range(1, n+1)]
-    return pot_matriz
+    target = backend or _matrix_kind(matriz)
+    if backend is None:
+        backend = _power_backend(matriz, n)
+        if backend == 'integer' and n < 0:
+            backend = 'sympy'
+    base = to_backend(matriz, backend)
+    if backend == 'sympy':
+        power = base**n
+    elif backend == 'sparse':
+        if n < 0:
+            raise ValueError("negative powers are not supported by the 'sparse' backend")
+        power = sparse.identity(base.shape[0], dtype=base.dtype, format='csr')
+        square = sparse.csr_matrix(base)
+        while n > 0:
+            if n % 2:
+                power = power @ square
+            n //= 2
+            if n:
+                square = square @ square
+    else:
+        power = np.linalg.matrix_power(base, n)
+    return to_backend(power, target)
 
 
 def integers_list(lista):
@@ -64,13 +279,76 @@ def int_eigvals_n(n):
         >>> int_eigvals_n(100)
         [0, 1, 4, 9, 16, 25, 36, 49, 64, 81, 100]
     """
-    enes=[]
-    for i in range(0, n+1):
-        matriz = sp.Matrix([[1, i], [1, 1]])
-        eigenvalores = list(matriz.eigenvals())
-        if integers_list(eigenvalores) == True:
-            enes.append(i)           
-    return enes
+    k = sp.symbols('k')
+    return int_eigvals_sweep(sp.Matrix([[1, k], [1, 1]]), k, range(0, n+1))
+
+
+def int_eigvals_sweep(family, param, values):
+    """Values of an integer parameter for which a family of matrices has
+    integer eigenvalues.
+
+    The characteristic polynomial is computed once in terms of the
+    parameter and evaluated for all the values with NumPy integers. For
+    2x2 families the discriminant is tested to be a perfect square, for
+    bigger families the rounded roots are checked exactly by Vieta's
+    formulas.
+
+    Args:
+        family (matrix): square sympy Matrix whose entries are polynomials
+        with integer coefficients in param.
+        param: sympy symbol of the parameter.
+        values: integer values of the parameter, its coefficients must fit
+        in 64 bit integers.
+
+    Returns:
+        list: the values for which all the eigenvalues are integers.
+
+    Raises:
+        ValueError: the characteristic polynomial has no integer
+        coefficients.
+
+    Examples:
+        >>> import sympy as sp
+        >>> k = sp.symbols('k')
+        >>> int_eigvals_sweep(sp.Matrix([[0, 1, 0], [0, 0, 1], [k, -k, 1]]), k, range(-20, 21))
+        [-16, -9, -4, -1, 0]
+        >>> int_eigvals_sweep(sp.Matrix([[0, k], [1, 0]]), k, range(0, 30))
+        [0, 1, 4, 9, 16, 25]
+    """
+    coeffs = family.charpoly().all_coeffs()
+    for coeff in coeffs:
+        if not all(c.is_integer for c in sp.Poly(coeff, param).coeffs()):
+            raise ValueError("the characteristic polynomial must have integer "
+                             "coefficients")
+    values = np.asarray(list(values), dtype=np.int64)
+    c = [np.broadcast_to(np.asarray(sp.lambdify(param, coeff, 'numpy')(values),
+                                    dtype=np.int64), values.shape)
+         for coeff in coeffs[1:]]
+    degree = len(c)
+    if degree <= 1:
+        mask = np.ones(values.shape, dtype=bool)
+    elif degree == 2:
+        disc = c[0]*c[0] - 4*c[1]
+        root = np.rint(np.sqrt(np.maximum(disc, 0))).astype(np.int64)
+        mask = disc >= 0
+        mask &= (root*root == disc) | ((root - 1)**2 == disc) | \
+            ((root + 1)**2 == disc)
+    else:
+        companion = np.zeros(shape=(values.size, degree, degree))
+        companion[:, 0, :] = -np.stack(c, axis=1)
+        companion[:, np.arange(1, degree), np.arange(degree - 1)] = 1
+        roots = np.linalg.eigvals(companion)
+        mask = np.all(np.abs(roots.imag) < 0.5, axis=1)
+        roots = np.rint(roots.real).astype(np.int64)
+        product = [np.ones(values.shape, dtype=np.int64)]
+        for j in range(degree):
+            r = roots[:, j]
+            product = [product[0]] + \
+                [product[i] - r*product[i - 1] for i in range(1, j + 1)] + \
+                [-r*product[-1]]
+        for i in range(degree):
+            mask &= product[i + 1] == c[i]
+    return [int(value) for value in values[mask]]
 
 
 def int_eigenvalues(matriz):
@@ -90,19 +368,76 @@ def int_eigenvalues(matriz):
         The Matrix([[1, 2], [1, 3]]) has not all its integer eigenvalues
         
     """
-    eigenvalues=list(matriz.eigenvals())
-    if integers_list(eigenvalues) == True:
+    if has_int_eigenvalues(matriz):
         print(f"The {matriz} has all its integer eigenvalues")
     else:
         print(f"The {matriz} has not all its integer eigenvalues")
 
 
-def inner_product(vector1, vector2):
+def has_int_eigenvalues(matriz):
+    """Exact test of whether all the eigenvalues of a matrix are integers.
+
+    The characteristic polynomial is computed with the fraction-free
+    Berkowitz algorithm and its integer roots are searched among the
+    divisors of its constant term, so no eigenvalue is computed in
+    radicals or in floating point.
+
+    Args:
+        matriz (matrix): square sympy Matrix with rational entries.
+
+    Returns:
+        bool: True if all the eigenvalues are integers, False otherwise.
+
+    Examples:
+        >>> import sympy as sp
+        >>> has_int_eigenvalues(sp.Matrix([[1, 2], [1, 3]]))
+        False
+        >>> has_int_eigenvalues(sp.Matrix([[2, 1, 0], [1, 2, 0], [0, 0, -4]]))
+        True
+    """
+    coeffs = sp.Matrix(matriz).charpoly().all_coeffs()
+    if not all(coeff.is_Rational for coeff in coeffs):
+        return integers_list(list(sp.Matrix(matriz).eigenvals()))
+    if not all(coeff.is_Integer for coeff in coeffs):
+        return False
+    coeffs = [int(coeff) for coeff in coeffs]
+    while len(coeffs) > 1 and coeffs[-1] == 0:
+        coeffs.pop()
+    if len(coeffs) == 1:
+        return True
+    # The integer roots r_i satisfy sum(r_i**2) = c1**2 - 2*c2, which
+    # bounds every |r_i| and rejects polynomials with complex roots.
+    c2 = coeffs[2] if len(coeffs) > 2 else 0
+    squares = coeffs[1]**2 - 2*c2
+    if squares < 0:
+        return False
+    bound = math.isqrt(squares)
+    if bound <= 10**6:
+        candidates = (d for d in range(1, bound + 1) if coeffs[-1] % d == 0)
+    else:
+        candidates = (d for d in sp.divisors(abs(coeffs[-1])) if d <= bound)
+    for d in candidates:
+        for root in (d, -d):
+            while len(coeffs) > 1:
+                quotient = [coeffs[0]]
+                for coeff in coeffs[1:]:
+                    quotient.append(coeff + root*quotient[-1])
+                if quotient.pop() != 0:
+                    break
+                coeffs = quotient
+        if len(coeffs) == 1:
+            return True
+    return False
+
+
+def inner_product(vector1, vector2, backend=None):
     """Inner product. 
 
     Args:
         vector1 (matrix): Sympy matrix 2x1
         vector1 (matrix): Sympy matrix 2x1.
+        backend (string, optional): backend used to compute the product.
+        Defaults to the cheapest one for both vectors.
 
     Returns:
         (float): usual inner product in :math:`\mathbb{R}^n`
@@ -114,10 +449,88 @@ def inner_product(vector1, vector2):
         >>> inner_product(v1, v2)
         2.0
     """
-    return float(list(vector1.T*vector2)[0])
+    backend = backend or _common_backend(vector1, vector2)
+    vector1 = to_backend(vector1, backend)
+    vector2 = to_backend(vector2, backend)
+    if backend == 'sympy':
+        return float(list(vector1.T*vector2)[0])
+    if backend == 'sparse':
+        return float((vector1.T @ vector2)[0, 0])
+    return float(np.ravel(vector1) @ np.ravel(vector2))
+
 
+def gram_matrix(vectors1, vectors2=None, block=None, out=None, backend=None):
+    """Inner products of every pair of vectors of two families.
 
-def change_basis(base1, base2):
+    Args:
+        vectors1: NumPy array (k, n), scipy.sparse matrix or sympy Matrix
+        whose rows are vectors.
+        vectors2 (optional): NumPy array (m, n), scipy.sparse matrix or sympy
+        Matrix whose rows are vectors. Defaults to vectors1.
+        block (int, optional): number of rows of each family multiplied at
+        the same time, so that memory-mapped inputs are read by blocks.
+        Defaults to all the rows in one product.
+        out (array, optional): NumPy array (k, m) where the result is
+        written and returned for every backend, converted to its dtype,
+        for example a np.memmap.
+        backend (string, optional): backend used to compute and to return
+        the products. Defaults to the cheapest one, returning the products
+        with the type of the vectors.
+
+    Returns:
+        The (k, m) matrix of inner products, a sympy Matrix with exact
+        entries for sympy input, a scipy.sparse matrix for sparse input and
+        a NumPy array otherwise.
+
+    Example:
+        >>> import numpy as np
+        >>> gram_matrix(np.array([[0, 1], [1, 2]]), np.array([[1, 2], [3, 4], [1, 0]]))
+        array([[ 2,  4,  0],
+               [ 5, 11,  1]])
+    """
+    if vectors2 is None:
+        vectors2 = vectors1
+    if out is None:
+        target = backend or _common_kind(vectors1, vectors2)
+    else:
+        target = 'numpy' if out.dtype != object else 'integer'
+    backend = backend or _common_backend(vectors1, vectors2)
+    vectors1 = to_backend(vectors1, backend)
+    vectors2 = to_backend(vectors2, backend)
+    if backend in ('sympy', 'sparse'):
+        if backend == 'sympy':
+            products = vectors1*vectors2.T
+        else:
+            products = sparse.csr_matrix(vectors1 @ vectors2.T)
+        if out is None:
+            return to_backend(products, target)
+        out[...] = (products.toarray() if backend == 'sparse'
+                    else np.array(products.tolist(), dtype=object))
+        return out
+    vectors1 = np.asarray(vectors1)
+    vectors2 = np.asarray(vectors2)
+    if block is None and out is None:
+        return to_backend(vectors1 @ vectors2.T, target)
+    dtype = np.result_type(vectors1, vectors2)
+    if out is None:
+        out = np.empty(shape=(vectors1.shape[0], vectors2.shape[0]),
+                       dtype=dtype)
+    # np.matmul only writes into out without casting between kinds, the
+    # other blocks (such as Python integers into floats) are assigned.
+    direct = np.can_cast(dtype, out.dtype, 'same_kind')
+    block = block or max(vectors1.shape[0], vectors2.shape[0], 1)
+    for i in range(0, vectors1.shape[0], block):
+        rows = vectors1[i:i + block]
+        for j in range(0, vectors2.shape[0], block):
+            if direct:
+                np.matmul(rows, vectors2[j:j + block].T,
+                          out=out[i:i + block, j:j + block])
+            else:
+                out[i:i + block, j:j + block] = rows @ vectors2[j:j + block].T
+    return out
+
+
+def change_basis(base1, base2, backend=None):
     """Change of basis matrix, a matrix that translates vector
     representations from one basis, such as the standard coordinate 
     system, to another basis.
@@ -125,6 +538,9 @@ def change_basis(base1, base2):
     Args:
         base1 (matriz): Sympy matrix as a representation of a base
         base2 (matriz): Sympy matrix as a representation of a base.
+        backend (string, optional): backend used to compute and to return
+        the matrix, 'integer' computes exactly with 'sympy'. Defaults to the
+        cheapest one, returning the matrix with the type of the bases.
 
     Returns:
         matrix: Change of basis matrix from base1 to base2
@@ -144,9 +560,223 @@ def change_basis(base1, base2):
         [4,  3]]), Matrix([
         [ 7/13,  1/26],
         [-5/13, -5/13]]))
+        >>> M = change_basis(B1, B2)
+        >>> M[0, 0] = 99
+        >>> change_basis(B1, B2)[0, 0]
+        7/13
     """
-    eb2 = base2.inv()*base1
-    return eb2
+    target = backend or _common_kind(base1, base2)
+    eb2 = change_basis_solver(base1, base2, backend=backend).matrix
+    matrix = to_backend(eb2, 'sympy' if target == 'integer' else target)
+    return _copy_matrix(matrix) if matrix is eb2 else matrix
+
+
+def _copy_matrix(matrix):
+    if isinstance(matrix, sp.MatrixBase):
+        return sp.Matrix(matrix)
+    if sparse.issparse(matrix):
+        return matrix.copy()
+    return np.array(matrix, copy=True)
+
+
+class ChangeOfBasis:
+    """Change of basis from base1 to base2 with base2 factored once.
+
+    base2 is LU factored (exactly for sympy matrices, with LAPACK for
+    NumPy arrays and with SuperLU for scipy.sparse matrices) and every
+    conversion solves with the factors instead of inverting base2.
+
+    Args:
+        base1 (matriz): Sympy matrix, NumPy array or scipy.sparse matrix as a
+        representation of a base
+        base2 (matriz): Sympy matrix, NumPy array or scipy.sparse matrix as a
+        representation of a base.
+        backend (string, optional): backend of the factorization, 'sympy'
+        and 'integer' are exact. Defaults to the cheapest one for both
+        bases.
+
+    Example:
+        >>> import sympy as sp
+        >>> B1 = sp.Matrix([[3, 2], [1, -1]])
+        >>> B2 = sp.Matrix([[2, -5], [4, 3]])
+        >>> ChangeOfBasis(B1, B2).apply(sp.Matrix([[1, 0], [0, 1]]))
+        Matrix([
+        [ 7/13,  1/26],
+        [-5/13, -5/13]])
+    """
+
+    def __init__(self, base1, base2, backend=None):
+        self.backend = backend or _common_backend(base1, base2)
+        self.symbolic = self.backend in ('sympy', 'integer')
+        if self.symbolic:
+            self.base1 = sp.ImmutableMatrix(to_backend(base1, 'sympy'))
+            self.lu = to_backend(base2, 'sympy').LUdecomposition()
+        else:
+            # Own copies, so that later in-place changes of the caller's
+            # arrays can not desynchronize the factors from the cache key.
+            self.base1 = _copy_matrix(to_backend(base1, self.backend))
+            self.base2 = _copy_matrix(to_backend(base2, self.backend))
+            self.lu = LinearSystem(self.base2)
+        self._matrix = None
+
+    def solve(self, vectors):
+        """Solve base2*x = vectors, for a vector or the columns of a matrix."""
+        if self.symbolic:
+            L, U, perm = self.lu
+            b = sp.Matrix(vectors).permute_rows(perm)
+            return U.upper_triangular_solve(L.lower_triangular_solve(b))
+        if sparse.issparse(vectors):
+            vectors = vectors.toarray()
+        return self.lu.solve(vectors)
+
+    def apply(self, vectors):
+        """Coordinates in base2 of vectors given by their coordinates in base1.
+
+        Args:
+            vectors: a vector or a matrix whose columns are vectors.
+
+        Returns:
+            The coordinates of the vectors in base2, in the same layout.
+        """
+        if self.symbolic:
+            return self.solve(self.base1*sp.Matrix(vectors))
+        if not sparse.issparse(vectors):
+            vectors = np.asarray(vectors)
+        return self.solve(self.base1 @ vectors)
+
+    @property
+    def matrix(self):
+        """Change of basis matrix from base1 to base2, sparse if both bases
+        are sparse.
+
+        The matrix is shared by every caller of a cached solver, so it is
+        an ImmutableMatrix or a read-only NumPy array; the sparse matrix
+        must not be modified either."""
+        if self._matrix is None and self.backend == 'sparse':
+            # Solve with the SuperLU factors of base2 a block of columns of
+            # base1 at a time, so only one dense block is alive at once.
+            base1 = sparse.csc_matrix(self.base1)
+            block = 256
+            self._matrix = sparse.hstack(
+                [sparse.csc_matrix(self.lu.solve(base1[:, j:j + block].toarray()))
+                 for j in range(0, base1.shape[1], block)], format='csc')
+        elif self._matrix is None and self.symbolic:
+            self._matrix = sp.ImmutableMatrix(self.solve(self.base1))
+        elif self._matrix is None:
+            self._matrix = self.solve(self.base1)
+            self._matrix.setflags(write=False)
+        return self._matrix
+
+
+def _basis_key(base):
+    if isinstance(base, sp.MatrixBase):
+        return sp.ImmutableMatrix(base)
+    if sparse.issparse(base):
+        base = sparse.csr_matrix(base, copy=True)
+        base.sum_duplicates()
+        base.eliminate_zeros()
+        return (base.shape, base.dtype.str, base.indptr.tobytes(),
+                base.indices.tobytes(), base.data.tobytes())
+    base = np.ascontiguousarray(base)
+    return base.shape, base.dtype.str, base.tobytes()
+
+
+_change_basis_cache = OrderedDict()
+
+
+def change_basis_solver(base1, base2, maxsize=128, backend=None):
+    """ChangeOfBasis from base1 to base2, kept in a cache of the last
+    maxsize pairs of bases so that each base2 is factored only once.
+
+    Args:
+        base1 (matriz): Sympy matrix or NumPy array as a representation of
+        a base
+        base2 (matriz): Sympy matrix or NumPy array as a representation of
+        a base.
+        maxsize (int, optional): number of cached pairs. Defaults to 128.
+        backend (string, optional): backend of the factorization. Defaults
+        to the cheapest one for both bases.
+
+    Returns:
+        ChangeOfBasis: the cached change of basis.
+
+    Example:
+        >>> import numpy as np
+        >>> B1 = np.array([[3., 2.], [1., -1.]])
+        >>> B2 = np.array([[2., -5.], [4., 3.]])
+        >>> change_basis_solver(B1, B2) is change_basis_solver(B1, B2)
+        True
+    """
+    backend = backend or _common_backend(base1, base2)
+    key = (_basis_key(base1), _basis_key(base2), backend)
+    if key in _change_basis_cache:
+        _change_basis_cache.move_to_end(key)
+        return _change_basis_cache[key]
+    solver = ChangeOfBasis(base1, base2, backend)
+    _change_basis_cache[key] = solver
+    while len(_change_basis_cache) > maxsize:
+        _change_basis_cache.popitem(last=False)
+    return solver
+
+
+class LinearSystem:
+    """Square linear system :math:`Ax = b` with A factored once.
+
+    Dense matrices are LU factored with LAPACK and scipy.sparse matrices
+    with SuperLU, so every right-hand side only costs two triangular
+    solves.
+
+    Args:
+        matrix: square NumPy array or scipy.sparse matrix.
+
+    Raises:
+        NoInvertible: the matrix is singular.
+
+    Example:
+        >>> import numpy as np
+        >>> system = LinearSystem(np.array([[2., 1.], [1., 3.]]))
+        >>> system.solve(np.array([3., 5.]))
+        array([0.8, 1.4])
+    """
+
+    def __init__(self, matrix):
+        self.sparse = sparse.issparse(matrix)
+        if self.sparse:
+            try:
+                self.lu = sparse_linalg.splu(sparse.csc_matrix(matrix))
+            except RuntimeError:
+                raise NoInvertible
+        else:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', linalg.LinAlgWarning)
+                self.lu = linalg.lu_factor(matrix, check_finite=False)
+            if not np.all(np.diag(self.lu[0])):
+                raise NoInvertible
+
+    def solve(self, rhs):
+        """Solution of the system for a vector or for the columns of a
+        matrix of right-hand sides."""
+        if self.sparse:
+            return self.lu.solve(np.asarray(rhs))
+        return linalg.lu_solve(self.lu, rhs)
+
+
+def solve_linear(matrix, rhs):
+    """Solution of the square linear system :math:`Ax = b`.
+
+    Args:
+        matrix: square NumPy array or scipy.sparse matrix.
+        rhs: a vector or a matrix whose columns are right-hand sides.
+
+    Returns:
+        array: the solution, with the same layout as rhs.
+
+    Example:
+        >>> import numpy as np
+        >>> solve_linear(np.array([[1., 1.], [-2., 1.]]), np.array([-2., 3.]))
+        array([-1.66666667, -0.33333333])
+    """
+    return LinearSystem(matrix).solve(rhs)
 
 
 def graph_solution(expr1, expr2, color1 = 'blue' , color2 = 'green'):
@@ -175,17 +805,15 @@ def graph_solution(expr1, expr2, color1 = 'blue' , color2 = 'green'):
         >>> graph_solution(expr1, expr2)
     """
     x, y = sp.symbols('x y')
-    a=sp.solve([y-expr1, y-expr2], [x, y])
     rect1 = sp.sympify(expr1)
     rect2 = sp.sympify(expr2, x)
+    system = [[-float(sp.diff(rect, x)), 1] for rect in (rect1, rect2)]
+    rhs = [float(rect.subs({x: 0})) for rect in (rect1, rect2)]
+    sol = LinearSystem(np.array(system)).solve(np.array(rhs))
+    a = {x: float(sol[0]), y: float(sol[1])}
     f1, f2 = sp.lambdify(x, rect1, 'numpy'), sp.lambdify(x, rect2, 'numpy')
-    if a == [0]:
-        domain = np.linspace(-5, 5)
-        image = np.linspace(-5, 5)
-    else:
-        domain = np.linspace(-5 + float(a[x]), 5 + float(a[x]))
-        image = np.linspace(-5 + float(a[y]), 5 + float(a[y]))
-    inter = [a[x],a[y]]
+    domain = np.linspace(-5 + float(a[x]), 5 + float(a[x]))
+    image = np.linspace(-5 + float(a[y]), 5 + float(a[y]))
     F_eval = f1(domain)
     G_eval = f2(domain)
     if type(G_eval) == float or type(G_eval) == int:
@@ -233,31 +861,101 @@ def plane_3points(p1, p2, p3):
     return sp.Eq(A.det(), 0)
 
 
-def descomposition_AyS(matrix):
+def planes_3points(p1, p2, p3):
+    """Coefficients of the planes passing through many triples of points.
+
+    Args:
+        p1: NumPy array (N, 3) with the first point of each triple
+        p2: NumPy array (N, 3) with the second point of each triple.
+        p3: NumPy array (N, 3) with the third point of each triple.
+
+    Returns:
+        array: (N, 4) with the coefficients [a, b, c, d] of the planes
+        ax + by + cz + d = 0, the same as plane_3points.
+
+    Example:
+        >>> import numpy as np
+        >>> planes_3points([[1, 2, -3]], [[2, 3, 1]], [[0, -2, -1]])
+        array([[ 18,  -6,  -3, -15]])
+    """
+    p1 = np.asarray(p1)
+    normal = np.cross(np.subtract(p2, p1), np.subtract(p3, p1))
+    coeffs = np.empty(shape=normal.shape[:-1] + (4,), dtype=normal.dtype)
+    coeffs[..., :3] = normal
+    coeffs[..., 3] = -np.einsum('...i,...i->...', normal, p1)
+    return coeffs
+
+
+def plane_fit(points):
+    """Least squares plane of a set of points.
+
+    Args:
+        points: NumPy array (k, 3) with k >= 3 points, or (..., k, 3) with a
+        stack of sets of points.
+
+    Returns:
+        array: (4,) or (..., 4) with the coefficients [a, b, c, d] of the
+        plane ax + by + cz + d = 0 that minimizes the sum of the squared
+        distances to the points, with (a, b, c) a unit vector.
+
+    Example:
+        >>> import numpy as np
+        >>> plane_fit([[0, 0, 1], [1, 0, 1], [0, 1, 1], [1, 1, 1]]).round(6)
+        array([ 0.,  0.,  1., -1.])
+    """
+    points = np.asarray(points, dtype=float)
+    centroid = points.mean(axis=-2)
+    centred = points - centroid[..., None, :]
+    scatter = centred.swapaxes(-1, -2) @ centred
+    normal = np.linalg.eigh(scatter)[1][..., :, 0]
+    coeffs = np.empty(shape=normal.shape[:-1] + (4,), dtype=float)
+    coeffs[..., :3] = normal
+    coeffs[..., 3] = -np.einsum('...i,...i->...', normal, centroid)
+    return coeffs
+
+
+def descomposition_AyS(matrix, backend=None):
     """Decomposition of a matrix as the sum of a symmetric matrix and an antisymmetric matrix.
     
+    Sympy matrices keep exact entries, dense NumPy arrays are computed in
+    place in the two results and scipy.sparse matrices stay sparse.
+
     Args:
-        matrix (Matriz): square sympy Matrix.
+        matrix (Matriz): square sympy Matrix, NumPy array or scipy.sparse matrix.
+        backend (string, optional): backend used to compute and to return
+        the matrices, 'integer' computes exactly with 'sympy'. Defaults to
+        the cheapest one, returning matrices with the type of matrix.
     
     Returns:
-        tuple: two sympy matrices such that when added they result in the given matrix.
+        tuple: two matrices, of the same kind as the given one, such that when
+        added they result in the given matrix.
 
     Example:
         >>> import sympy as sp
         >>> descomposition_AyS(sp.Matrix([[1, 5], [-3, 2]]))
-        The matrix Matrix([[1, 5], [-3, 2]]) is the sum of the following 
-        symmetric and antisymmetric matrices:
         (Matrix([
-        [1.0, 1.0],
-        [1.0, 2.0]]), Matrix([
-        [   0, 4.0],
-        [-4.0,   0]]))
+        [1, 1],
+        [1, 2]]), Matrix([
+        [ 0, 4],
+        [-4, 0]]))
     """
-    S = 1/2*(matrix + matrix.T)
-    A = 1/2*(matrix - matrix.T)
-    print(f"The matrix {matrix} is the sum of the following \nsymmetric and antisymmetric matrices:")
-    return S, A
-
+    target = backend or _matrix_kind(matrix)
+    backend = backend or matrix_backend(matrix)
+    if target == 'integer':
+        target = 'sympy'
+    if backend == 'integer':
+        backend = 'sympy'
+    matrix = to_backend(matrix, backend)
+    if backend in ('sympy', 'sparse'):
+        S = (matrix + matrix.T)/2
+        A = (matrix - matrix.T)/2
+    else:
+        dtype = np.result_type(matrix, 0.5)
+        S = np.add(matrix, matrix.T, dtype=dtype)
+        S /= 2
+        A = np.subtract(matrix, matrix.T, dtype=dtype)
+        A /= 2
+    return to_backend(S, target), to_backend(A, target)
 
 
 class NoInvertible(Exception):
@@ -269,7 +967,8 @@ def orthogonal(matrix):
     """Orthogonality of a square matrix, by definition it should be invertible
     
     Args:
-        matrix (Matrix): A square Sympy matrix.
+        matrix (Matrix): A square Sympy matrix, NumPy array or scipy.sparse
+        matrix, the numeric ones are checked with is_orthogonal.
     
     Returns: 
         string: '{matrix} is a orthogonal matrix' or '{matrix} is not a orthogonal matrix'
@@ -284,11 +983,59 @@ def orthogonal(matrix):
         Matrix([[0, 1], [-1, 0]]) is a orthogonal matrix
         
     """
-    if matrix.det() == 0:
+    if not isinstance(matrix, sp.MatrixBase):
+        if is_orthogonal(matrix):
+            print(f"{matrix} is a orthogonal matrix")
+        else:
+            print(f"{matrix} is not a orthogonal matrix")
+    elif matrix.det() == 0:
         return NoInvertible
     else:
         P = matrix*matrix.T
         if P.is_Identity:
             print(f"{matrix} is a orthogonal matrix")
         else:
-            print(f"{matrix} is not a orthogonal matrix")
\ No newline at end of file
+            print(f"{matrix} is not a orthogonal matrix")
+
+
+def is_orthogonal(matrix, tol=1e-10, backend=None):
+    """Orthogonality test, :math:`QQ^T = I`, which also implies that the
+    matrix is invertible, so no determinant is computed.
+
+    Args:
+        matrix: a square Sympy matrix, a square scipy.sparse matrix, a square
+        NumPy array or a NumPy array of shape (..., n, n) with a stack of
+        square matrices.
+        tol (float, optional): largest Frobenius norm of :math:`QQ^T - I`
+        accepted for numeric input. Defaults to 1e-10.
+        backend (string, optional): backend used for the test, 'sympy' and
+        'integer' are exact. Defaults to the cheapest one.
+
+    Returns:
+        bool: True if the matrix is orthogonal, or a boolean NumPy array
+        with one value for every matrix of the stack.
+
+    Example:
+        >>> import numpy as np
+        >>> is_orthogonal(np.array([[[0, 1], [-1, 0]], [[1, 1], [0, 1]]]))
+        array([ True, False])
+    """
+    backend = backend or matrix_backend(matrix)
+    if backend in ('sympy', 'integer'):
+        matrix = to_backend(matrix, 'sympy')
+        return matrix.is_square and (matrix*matrix.T).is_Identity
+    matrix = to_backend(matrix, backend)
+    if backend == 'sparse':
+        if matrix.shape[0] != matrix.shape[1]:
+            raise ValueError("is_orthogonal needs square matrices")
+        P = sparse.csr_matrix(matrix @ matrix.T) - \
+            sparse.identity(matrix.shape[0])
+        return bool(np.sqrt(np.sum(np.abs(P.data)**2)) <= tol)
+    matrix = np.asarray(matrix)
+    if matrix.ndim < 2 or matrix.shape[-1] != matrix.shape[-2]:
+        raise ValueError("is_orthogonal needs square matrices")
+    P = matrix @ np.swapaxes(matrix, -1, -2)
+    diagonal = np.einsum('...ii->...i', P)
+    diagonal -= 1
+    norm = np.sqrt(np.einsum('...ij,...ij->...', P, P))
+    return norm <= tol if norm.ndim else bool(norm <= tol)
@@ -1,7 +1,13 @@
 #File to MathematicalModels
 from matplotlib import pyplot as plt
-from celluloid import Camera
+from matplotlib.animation import FuncAnimation
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.image import imsave
+from multiprocessing import shared_memory
+import multiprocessing as mp
 import numpy as np
+import os
 
 #Lotka-Volterra predator-prey model
 
@@ -150,18 +156,413 @@ def rungekutta2_fg(f, g, t0, x0, y0, h, samples):
         yi = yi + (1/2)*(K1y+K2y)
         ti = ti + h
         table[i] = [ti, xi, yi]
-    table = np.array(table)
-    ti = table[:, 0]
-    xi = table[:, 1]
-    yi = table[:, 2]
     np.set_printoptions(precision=6)
     print(' [ ti, xi, yi]')
     return table
+
+
+def rungekutta2_fg_chunks(f, g, t0, x0, y0, h, samples, chunk=65536, out=None):
+    """A generator that, integrates the same system as rungekutta2_fg but
+    yields the table [ti, xi, yi] in blocks of at most chunk rows, so long
+    runs never hold the whole table in memory. It does not print nor change
+    the NumPy print options.
+
+    Args:
+        f: first differential equation
+        g: second differential equation
+        t0: initial condition of the observation time
+        x0: initial condition of the number of dams
+        y0: initial condition of the number of predators
+        h: algorithm parameter
+        samples (int): total number of samples
+        chunk (int, optional): number of rows of each block. Defaults to 65536.
+        out (array, optional): array of shape (samples+1, 3) where the rows
+        are written, for example a np.memmap. If None, one buffer of chunk
+        rows is reused, so every block is overwritten by the next one.
+
+    Yields:
+        array: views of shape (rows, 3) with the next rows of the table.
+
+    Example:
+    >>> from limathpy import rungekutta2_fg_chunks
+    >>> f = lambda t, x, y: 0.5*x - 0.7*x*y
+    >>> g = lambda t, x, y: - 0.35*y + 0.35*x*y
+    >>> [block[-1].round(6) for block in rungekutta2_fg_chunks(f, g, 0, 2, 1, 0.5, 3, 2)]
+    [array([0.5     , 1.754875, 1.16975 ]), array([1.5     , 1.167405, 1.373599])]"""
+    size = samples + 1
+    if out is None:
+        buffer = np.empty(shape=(min(chunk, size), 3), dtype=float)
+    elif out.shape != (size, 3):
+        raise ValueError(f"out must have shape {(size, 3)}, not {out.shape}")
+    ti = t0
+    xi = x0
+    yi = y0
+    for start in range(0, size, chunk):
+        stop = min(start + chunk, size)
+        block = buffer[:stop - start] if out is None else out[start:stop]
+        for j in range(stop - start):
+            if start + j > 0:
+                K1x = h * f(ti, xi, yi)
+                K1y = h * g(ti, xi, yi)
+                K2x = h * f(ti+h, xi + K1x, yi+K1y)
+                K2y = h * g(ti+h, xi + K1x, yi+K1y)
+                xi = xi + (1/2)*(K1x+K2x)
+                yi = yi + (1/2)*(K1y+K2y)
+                ti = ti + h
+            block[j] = [ti, xi, yi]
+        yield block
+
+
+def rungekutta2_fg_into(f, g, t0, x0, y0, h, samples, out, chunk=65536):
+    """A function that, writes the table of rungekutta2_fg directly into a
+    given array or into a memory-mapped .npy file, without extra copies.
+
+    Args:
+        f: first differential equation
+        g: second differential equation
+        t0: initial condition of the observation time
+        x0: initial condition of the number of dams
+        y0: initial condition of the number of predators
+        h: algorithm parameter
+        samples (int): total number of samples
+        out: array of shape (samples+1, 3) or the path of a .npy file that
+        is created as a memory map.
+        chunk (int, optional): rows computed between flushes of a memory map.
+        Defaults to 65536.
+
+    Returns:
+        array: out, or the np.memmap of the created file.
+
+    Example:
+    >>> from limathpy import rungekutta2_fg_into
+    >>> f = lambda t, x, y: 0.5*x - 0.7*x*y
+    >>> g = lambda t, x, y: - 0.35*y + 0.35*x*y
+    >>> import os, tempfile
+    >>> with tempfile.TemporaryDirectory() as tmp:
+    ...     table = rungekutta2_fg_into(f, g, 0, 2, 1, 0.5, 1000,
+    ...                                 os.path.join(tmp, 'lotka.npy'))
+    ...     print(table.shape)
+    ...     del table
+    (1001, 3)"""
+    if isinstance(out, str):
+        out = np.lib.format.open_memmap(out, mode='w+', dtype=float,
+                                        shape=(samples + 1, 3))
+    for block in rungekutta2_fg_chunks(f, g, t0, x0, y0, h, samples, chunk,
+                                       out):
+        if isinstance(out, np.memmap):
+            out.flush()
+    return out
+
+
+#State of the workers of rungekutta2_fg_sweep, set once per process.
+
+_sweep = {}
+
+
+def _sweep_init(f, g, t0, h, samples, grid, name, shape):
+    _sweep['shm'] = shared_memory.SharedMemory(name=name)
+    _sweep['table'] = np.ndarray(shape, dtype=float, buffer=_sweep['shm'].buf)
+    _sweep['args'] = (f, g, t0, h, samples, grid)
+
+
+def _sweep_run(start, stop):
+    f, g, t0, h, samples, grid = _sweep['args']
+    for k in range(start, stop):
+        a, b, c, d, x0, y0 = grid[k]
+        fk = lambda t, x, y: f(t, x, y, a, b, c, d)
+        gk = lambda t, x, y: g(t, x, y, a, b, c, d)
+        for block in rungekutta2_fg_chunks(fk, gk, t0, x0, y0, h, samples,
+                                           samples + 1, _sweep['table'][k]):
+            pass
+
+
+def rungekutta2_fg_sweep(f, g, t0, grid, h, samples, processes=None,
+                         chunk=None):
+    """A function that, integrates with rungekutta2_fg one system for every
+    row (a, b, c, d, x0, y0) of a parameter grid, distributing the rows over
+    a pool of processes that write the trajectories in shared memory.
+
+    Use it when f and g can not work with NumPy arrays, otherwise
+    rungekutta2_fg_ensemble is faster. The functions are inherited by the
+    workers, so lambdas can be used where processes are started by fork.
+
+    Args:
+        f: first differential equation, called as f(t, x, y, a, b, c, d)
+        g: second differential equation, called as g(t, x, y, a, b, c, d)
+        t0: initial condition of the observation time
+        grid: array of shape (members, 6) with the rows (a, b, c, d, x0, y0)
+        h: algorithm parameter
+        samples (int): total number of samples
+        processes (int, optional): number of processes. Defaults to the
+        number of CPUs.
+        chunk (int, optional): rows of the grid in every task. Defaults to
+        an even split in four tasks per process.
+
+    Returns:
+        array: of shape (members, samples+1, 3) with the rows [ti, xi, yi] of
+        every member.
+
+    Example:
+    >>> import numpy as np
+    >>> from limathpy import rungekutta2_fg_sweep
+    >>> f = lambda t, x, y, a, b, c, d: a*x - b*x*y
+    >>> g = lambda t, x, y, a, b, c, d: - c*y + d*x*y
+    >>> grid = [[0.5, 0.7, 0.35, 0.35, 2, 1], [0.5, 0.7, 0.35, 0.35, 1, 2]]
+    >>> table = rungekutta2_fg_sweep(f, g, 0, grid, 0.5, 101, processes=2)
+    >>> table.shape
+    (2, 102, 3)
+    >>> table[0, 1].round(6)
+    array([0.5     , 1.754875, 1.16975 ])"""
+    grid = np.asarray(grid, dtype=float).reshape(-1, 6)
+    members = grid.shape[0]
+    shape = (members, samples + 1, 3)
+    processes = processes or mp.cpu_count()
+    chunk = chunk or max(1, -(-members // (4*processes)))
+    tasks = [(start, min(start + chunk, members))
+             for start in range(0, members, chunk)]
+    shm = shared_memory.SharedMemory(create=True,
+                                     size=max(1, int(np.prod(shape))*8))
+    try:
+        initargs = (f, g, t0, h, samples, grid, shm.name, shape)
+        if processes == 1:
+            _sweep_init(*initargs)
+            for task in tasks:
+                _sweep_run(*task)
+            _sweep.pop('shm').close()
+            _sweep.clear()
+        else:
+            methods = mp.get_all_start_methods()
+            context = mp.get_context('fork' if 'fork' in methods else None)
+            with context.Pool(processes, _sweep_init, initargs) as pool:
+                pool.starmap(_sweep_run, tasks)
+        table = np.ndarray(shape, dtype=float, buffer=shm.buf).copy()
+    finally:
+        shm.close()
+        shm.unlink()
+    return table
+
+
+def rungekutta2_fg_ensemble(f, g, t0, x0, y0, h, samples, params=()):
+    """A function that, integrates many Lotka-Volterra type systems at once
+    with 2nd Order Runge Kutta, advancing every member in one NumPy step.
+
+    Args:
+        f: first differential equation, it must accept NumPy arrays
+        g: second differential equation, it must accept NumPy arrays
+        t0: initial condition of the observation time
+        x0: array with the initial conditions of the number of dams
+        y0: array with the initial conditions of the number of predators
+        h: algorithm parameter
+        samples (int): total number of samples
+        params (tuple, optional): arrays (or scalars) of per-member parameters,
+        they are passed to f and g after t, x and y. Defaults to no parameters.
+
+    Returns:
+        array: of shape (members, samples+1, 3) with the rows [ti, xi, yi] of
+        every member.
+
+    Example:
+    >>> import numpy as np
+    >>> from limathpy import rungekutta2_fg_ensemble
+    >>> f = lambda t, x, y, a, b: a*x - b*x*y
+    >>> g = lambda t, x, y, a, b: - 0.35*y + 0.35*x*y
+    >>> a = np.array([0.5, 0.6])
+    >>> b = np.array([0.7, 0.7])
+    >>> table = rungekutta2_fg_ensemble(f, g, 0, [2, 2], [1, 1], 0.5, 101, (a, b))
+    >>> table.shape
+    (2, 102, 3)
+    >>> table[0, 1].round(6)
+    array([0.5     , 1.754875, 1.16975 ])"""
+    x0, y0, *params = np.broadcast_arrays(np.asarray(x0, dtype=float),
+                                          np.asarray(y0, dtype=float),
+                                          *[np.asarray(p, dtype=float) for p in params])
+    x0 = np.ravel(x0)
+    y0 = np.ravel(y0)
+    params = [np.ravel(p) for p in params]
+    size = samples + 1
+    table = np.empty(shape=(x0.size, size, 3), dtype=float)
+    table[:, :, 0] = t0 + h*np.arange(size)
+    table[:, 0, 1] = x0
+    table[:, 0, 2] = y0
+    ti = t0
+    xi = x0
+    yi = y0
+    for i in range(1, size, 1):
+        K1x = h * f(ti, xi, yi, *params)
+        K1y = h * g(ti, xi, yi, *params)
+        K2x = h * f(ti+h, xi + K1x, yi+K1y, *params)
+        K2y = h * g(ti+h, xi + K1x, yi+K1y, *params)
+        xi = xi + (1/2)*(K1x+K2x)
+        yi = yi + (1/2)*(K1y+K2y)
+        ti = ti + h
+        table[:, i, 1] = xi
+        table[:, i, 2] = yi
+    return table
+
+
+#Dormand-Prince coefficients of the embedded Runge Kutta 5(4) pair and its
+#dense output polynomial.
+
+_DP_C = np.array([0, 1/5, 3/10, 4/5, 8/9, 1])
+_DP_A = [[],
+         [1/5],
+         [3/40, 9/40],
+         [44/45, -56/15, 32/9],
+         [19372/6561, -25360/2187, 64448/6561, -212/729],
+         [9017/3168, -355/33, 46732/5247, 49/176, -5103/18656]]
+_DP_B = np.array([35/384, 0, 500/1113, 125/192, -2187/6784, 11/84])
+_DP_E = np.array([-71/57600, 0, 71/16695, -71/1920, 17253/339200, -22/525,
+                  1/40])
+_DP_P = np.array([
+    [1, -8048581381/2820520608, 8663915743/2820520608,
+     -12715105075/11282082432],
+    [0, 0, 0, 0],
+    [0, 131558114200/32700410799, -68118460800/10900136933,
+     87487479700/32700410799],
+    [0, -1754552775/470086768, 14199869525/1410260304,
+     -10690763975/1880347072],
+    [0, 127303824393/49829197408, -318862633887/49829197408,
+     701980252875/199316789632],
+    [0, -282668133/205662961, 2019193451/616988883,
+     -1453857185/822651844],
+    [0, 40617522/29380423, -110615467/29380423, 69997945/29380423]])
+
+
+def dormand_prince(functions, t0, state0, t_eval, rtol=1e-6, atol=1e-9,
+                   h=None, max_steps=100000):
+    """A function that, solves a system of N ordinary differential equations
+    with the adaptive Runge Kutta method of Dormand and Prince (RK45) and
+    returns the solution at the requested times by dense interpolation.
+
+    Args:
+        functions (list): the N differential equations, each one is called
+        as f(t, x1, ..., xN) like the equations of rungekutta2_fg
+        t0: initial condition of the observation time
+        state0 (list): initial conditions [x1, ..., xN]
+        t_eval (list): increasing times, not smaller than t0, where the
+        solution is required
+        rtol (float, optional): relative tolerance. Defaults to 1e-6.
+        atol (float, optional): absolute tolerance. Defaults to 1e-9.
+        h (float, optional): initial step, estimated automatically if None.
+        max_steps (int, optional): maximum number of accepted and rejected
+        steps. Defaults to 100000.
+
+    Returns:
+        array: of shape (len(t_eval), N+1) with the rows [ti, x1i, ..., xNi].
+
+    Raises:
+        ValueError: t_eval is not increasing or starts before t0.
+        RuntimeError: the solution needs more than max_steps steps.
+
+    Example:
+    >>> import numpy as np
+    >>> from limathpy import dormand_prince
+    >>> f = lambda t, x, y: 0.5*x - 0.7*x*y
+    >>> g = lambda t, x, y: - 0.35*y + 0.35*x*y
+    >>> table = dormand_prince([f, g], 0, [2, 1], np.linspace(0, 50, 5))
+    >>> table.round(4)
+    array([[ 0.    ,  2.    ,  1.    ],
+           [12.5   ,  1.4166,  0.3323],
+           [25.    ,  0.5595,  0.3666],
+           [37.5   ,  0.3514,  0.7301],
+           [50.    ,  0.7836,  1.3586]])"""
+    def F(t, state):
+        return np.array([fi(t, *state) for fi in functions], dtype=float)
+
+    t_eval = np.asarray(t_eval, dtype=float)
+    if np.any(np.diff(t_eval) < 0) or (t_eval.size and t_eval[0] < t0):
+        raise ValueError("t_eval must be increasing and not smaller than t0")
+    state = np.asarray(state0, dtype=float)
+    table = np.empty(shape=(t_eval.size, state.size + 1), dtype=float)
+    table[:, 0] = t_eval
+    if t_eval.size == 0:
+        return table
+    t_end = t_eval[-1]
+    K = np.empty(shape=(7, state.size), dtype=float)
+    K[0] = F(t0, state)
+    ti = t0
+    if h is None:
+        scale = atol + np.abs(state)*rtol
+        d0 = np.sqrt(np.mean((state/scale)**2))
+        d1 = np.sqrt(np.mean((K[0]/scale)**2))
+        h = 1e-6 if d0 < 1e-5 or d1 < 1e-5 else 0.01*d0/d1
+    h = min(abs(h), t_end - t0) or 1e-6
+    done = np.searchsorted(t_eval, t0, side='right')
+    table[:done, 1:] = state
+    steps = 0
+    while done < t_eval.size:
+        steps += 1
+        if steps > max_steps:
+            raise RuntimeError(f"dormand_prince needs more than {max_steps} "
+                               f"steps")
+        h = min(h, t_end - ti)
+        for s in range(1, 6):
+            K[s] = F(ti + _DP_C[s]*h, state + h*np.dot(_DP_A[s], K[:s]))
+        new_state = state + h*np.dot(_DP_B, K[:6])
+        K[6] = F(ti + h, new_state)
+        scale = atol + np.maximum(np.abs(state), np.abs(new_state))*rtol
+        error = np.sqrt(np.mean((h*np.dot(_DP_E, K)/scale)**2))
+        if error > 1:
+            h = h*max(0.2, 0.9*error**(-1/5))
+            continue
+        t_new = ti + h
+        stop = np.searchsorted(t_eval, t_new, side='right')
+        if stop > done:
+            theta = (t_eval[done:stop] - ti)/h
+            powers = np.cumprod(np.repeat(theta[:, None], 4, axis=1), axis=1)
+            table[done:stop, 1:] = state + h*powers.dot(K.T.dot(_DP_P).T)
+            done = stop
+        ti = t_new
+        state = new_state
+        K[0] = K[6]
+        h = h*(10 if error == 0 else min(10, 0.9*error**(-1/5)))
+    return table
         
     
+def cobweb(par, x0, it):
+    """A function that, returns the vertices of the spiderweb diagram of the
+    logistic map par*x*(1-x).
+
+    Args:
+        par: parameter of the logistic map
+        x0: initial condition
+        it: number of steps
+
+    Returns:
+        tuple: two arrays x, y of length 2*it+1 with the vertices of the
+        polyline (x0, x0), (x0, x1), (x1, x1), (x1, x2), ...
+
+    Example:
+    >>> from limathpy import cobweb
+    >>> cobweb(2, 0.5, 2)
+    (array([0.5, 0.5, 0.5, 0.5, 0.5]), array([0.5, 0.5, 0.5, 0.5, 0.5]))"""
+    orbit = np.empty(it + 1, dtype=float)
+    orbit[0] = x0
+    for i in range(it):
+        orbit[i + 1] = par*orbit[i]*(1 - orbit[i])
+    vertices = np.repeat(orbit, 2)
+    return vertices[:2*it + 1], vertices[1:2*it + 2]
+
+
+def _diagram_axes(ax, par, x, y):
+    s = np.arange(0, 1, 0.01)
+    ax.plot(s, par*s*(1 - s), color='blue')
+    ax.plot(s, s, color='black')
+    line, = ax.plot(x, y, color='red')
+    return line
+
+
 def diagram(par, x0, it):
     """A function that, returns a spiderweb diagram of some function.
 
+    The orbit is computed once and every frame only extends the red
+    polyline. Blitting keeps the logistic curve and the diagonal out of
+    the redraws of an interactive backend, but the polyline is still
+    redrawn from the start in every frame, and to_html5_video and save
+    ignore blitting and redraw the whole figure, so the cost of rendering
+    grows quadratically with it. Use diagram_frames for long orbits, it
+    draws only the new segment of each frame.
+
     Args:
         par: is a simple structured text parser project
         x0: initial condition
@@ -169,46 +570,255 @@ def diagram(par, x0, it):
 
     Example:
     >>> from matplotlib import pyplot as plt
-    >>> from celluloid import Camera
     >>> from IPython.display import HTML
     >>> import numpy as np
     >>> from limathpy import diagram
     >>> anim = diagram(3.8, 0.1, 200)
     >>> HTML(anim.to_html5_video())
     <IPython.core.display.HTML object>"""
-    def f(x):
-        return par*x*(1-x)
+    x, y = cobweb(par, x0, it)
     fig, ax = plt.subplots()
-    camera = Camera(fig)
-    x = [x0]
-    y = [x0]
-    s = np.arange(0, 1, 0.01)
+    line = _diagram_axes(ax, par, x, y)
 
-    for i in range(it):
-        ax.plot(s, f(s), color='blue')
-        ax.plot(s, s, color='black')
-        x.append(x[2*i])
-        x.append(f(x[2*i]))
-        y.append(f(y[2*i]))
-        y.append(f(y[2*i]))
-        ax.plot(x, y, color='red')
-        camera.snap()
-    return camera.animate()
+    def frame(i):
+        line.set_data(x[:2*i + 3], y[:2*i + 3])
+        return line,
+    return FuncAnimation(fig, frame, frames=it, init_func=lambda: frame(0),
+                         blit=True)
+
+
+def _diagram_frames_run(par, x0, it, directory, start, stop, dpi):
+    x, y = cobweb(par, x0, it)
+    fig = Figure(dpi=dpi)
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    line = _diagram_axes(ax, par, x, y)
+    line.set_data(x[:2*start + 1], y[:2*start + 1])
+    canvas.draw()
+    paths = []
+    for i in range(start, stop):
+        line.set_data(x[2*i:2*i + 3], y[2*i:2*i + 3])
+        ax.draw_artist(line)
+        path = os.path.join(directory, f"frame_{i:06d}.png")
+        imsave(path, np.asarray(canvas.buffer_rgba()))
+        paths.append(path)
+    return paths
+
+
+def diagram_frames(par, x0, it, directory, processes=None, dpi=100):
+    """A function that, renders the frames of diagram as png images without
+    a display, in parallel processes.
+
+    Every process draws the curves once and then only the new segment of
+    the spiderweb on each frame, so the cost of every frame does not grow
+    with the number of steps.
+
+    Args:
+        par: parameter of the logistic map
+        x0: initial condition
+        it: number of steps
+        directory (str): existing directory where the frames are saved
+        processes (int, optional): number of processes. Defaults to the
+        number of CPUs.
+        dpi (int, optional): resolution of the frames. Defaults to 100.
+
+    Returns:
+        list: the paths of the it frames, in order.
+
+    Example:
+    >>> from limathpy import diagram_frames
+    >>> import os, tempfile
+    >>> with tempfile.TemporaryDirectory() as tmp:
+    ...     paths = diagram_frames(3.8, 0.1, 4, tmp, processes=2, dpi=20)
+    ...     print([os.path.basename(path) for path in paths])
+    ['frame_000000.png', 'frame_000001.png', 'frame_000002.png', 'frame_000003.png']"""
+    processes = processes or mp.cpu_count()
+    size = -(-it // processes) if it else 1
+    tasks = [(par, x0, it, directory, start, min(start + size, it), dpi)
+             for start in range(0, it, size)]
+    if processes == 1:
+        return [path for task in tasks for path in _diagram_frames_run(*task)]
+    with mp.Pool(processes) as pool:
+        return [path for paths in pool.starmap(_diagram_frames_run, tasks)
+                for path in paths]
+
+
+def logistic_bifurcation_blocks(pars, x0=0.5, transient=1000,
+                                iterations=1000, samples=100, block=4096):
+    """A generator that, iterates the logistic map par*x*(1-x) for many
+    values of par at once and yields, block by block, samples of the
+    attractor and the Lyapunov exponent of every parameter.
+
+    Only block parameters are iterated at the same time, so the memory
+    used does not depend on the size of the parameter grid.
+
+    Args:
+        pars: array of values of the parameter of the logistic map
+        x0 (optional): initial condition. Defaults to 0.5.
+        transient (int, optional): iterations that are discarded.
+        Defaults to 1000.
+        iterations (int, optional): iterations after the transient used to
+        estimate the Lyapunov exponent. Defaults to 1000.
+        samples (int, optional): last iterations that are returned as
+        samples of the attractor, at most iterations. Defaults to 100.
+        block (int, optional): number of parameters of every block.
+        Defaults to 4096.
+
+    Yields:
+        tuple: (pars, attractor, lyapunov) for the next block, with
+        attractor of shape (len(pars), samples) and lyapunov of shape
+        (len(pars),).
+
+    Example:
+    >>> from limathpy import logistic_bifurcation_blocks
+    >>> [p for p, attractor, lyapunov in logistic_bifurcation_blocks([1, 2, 3, 4], block=2)]
+    [array([1., 2.]), array([3., 4.])]"""
+    pars = np.ravel(np.asarray(pars, dtype=float))
+    samples = min(samples, iterations)
+    for start in range(0, pars.size, block):
+        r = pars[start:start + block]
+        x = np.full(r.size, x0, dtype=float)
+        temp = np.empty_like(x)
+        for i in range(transient):
+            np.subtract(1, x, out=temp)
+            x *= temp
+            x *= r
+        attractor = np.empty(shape=(r.size, samples), dtype=float)
+        lyapunov = np.zeros(r.size, dtype=float)
+        with np.errstate(divide='ignore'):
+            for i in range(iterations):
+                np.multiply(x, -2, out=temp)
+                temp += 1
+                temp *= r
+                np.abs(temp, out=temp)
+                lyapunov += np.log(temp, out=temp)
+                np.subtract(1, x, out=temp)
+                x *= temp
+                x *= r
+                if i >= iterations - samples:
+                    attractor[:, i - iterations + samples] = x
+        if iterations:
+            lyapunov /= iterations
+        yield r, attractor, lyapunov
+
+
+def logistic_bifurcation(pars, x0=0.5, transient=1000, iterations=1000,
+                         samples=100, block=4096):
+    """A function that, returns samples of the attractor of the logistic map
+    par*x*(1-x) and its Lyapunov exponent for every value of par, the data
+    of a bifurcation diagram.
+
+    Args:
+        pars: array of values of the parameter of the logistic map
+        x0 (optional): initial condition. Defaults to 0.5.
+        transient (int, optional): iterations that are discarded.
+        Defaults to 1000.
+        iterations (int, optional): iterations after the transient used to
+        estimate the Lyapunov exponent. Defaults to 1000.
+        samples (int, optional): last iterations that are returned as
+        samples of the attractor, at most iterations. Defaults to 100.
+        block (int, optional): number of parameters iterated at the same
+        time. Defaults to 4096.
+
+    Returns:
+        tuple: attractor of shape (len(pars), samples) and lyapunov of shape
+        (len(pars),).
+
+    Example:
+    >>> import numpy as np
+    >>> from limathpy import logistic_bifurcation
+    >>> attractor, lyapunov = logistic_bifurcation([2.5, 3.2, 3.9], samples=2)
+    >>> attractor.round(4)
+    array([[0.6   , 0.6   ],
+           [0.7995, 0.513 ],
+           [0.7427, 0.7453]])
+    >>> lyapunov.round(2)
+    array([-0.69, -0.92,  0.5 ])"""
+    blocks = list(logistic_bifurcation_blocks(pars, x0, transient, iterations,
+                                              samples, block))
+    if not blocks:
+        return (np.empty(shape=(0, min(samples, iterations))),
+                np.empty(shape=0))
+    return (np.concatenate([attractor for r, attractor, lyapunov in blocks]),
+            np.concatenate([lyapunov for r, attractor, lyapunov in blocks]))
+
+
+def _fibonacci_pair(k, m=None):
+    """Standard Fibonacci numbers (F(k), F(k+1)) by fast doubling, modulo m
+    if it is given."""
+    a, b = 0, 1
+    for bit in bin(k)[2:]:
+        c = a*(2*b - a)
+        d = a*a + b*b
+        a, b = (d, c + d) if bit == '1' else (c, d)
+        if m is not None:
+            a, b = a % m, b % m
+    return a, b
 
 
 def fibonacci(n):
     """A function that, returns the n-th Fibonacci number
 
+    It uses fast doubling, so it takes O(log n) big integer operations.
+
     Args:
         n (int): the integer number
 
+    Raises:
+        ValueError: n is smaller than 1.
+
     Example:
     >>> from limathpy import fibonacci
     >>> [fibonacci(n) for n in range(1, 20)]
     [0, 1, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144, 233, 377, 610, 987, 1597, 2584]"""
-    if n == 1:
-        return 0
-    elif n == 2:
-        return 1
-    else:
-        return fibonacci(n-1) + fibonacci(n-2)
+    if n < 1:
+        raise ValueError("n must be a positive integer")
+    return _fibonacci_pair(n - 1)[0]
+
+
+def fibonacci_range(a, b):
+    """A function that, returns the Fibonacci numbers from the a-th to the
+    b-th, in one linear pass.
+
+    Args:
+        a (int): index of the first number
+        b (int): index of the last number
+
+    Returns:
+        list: [fibonacci(a), ..., fibonacci(b)]
+
+    Raises:
+        ValueError: a is smaller than 1.
+
+    Example:
+    >>> from limathpy import fibonacci_range
+    >>> fibonacci_range(10, 15)
+    [34, 55, 89, 144, 233, 377]"""
+    if a < 1:
+        raise ValueError("a must be a positive integer")
+    x, y = _fibonacci_pair(a - 1)
+    numbers = []
+    for i in range(a, b + 1):
+        numbers.append(x)
+        x, y = y, x + y
+    return numbers
+
+
+def fibonacci_mod(n, m):
+    """A function that, returns the n-th Fibonacci number modulo m, without
+    computing the whole number, so n can be huge.
+
+    Args:
+        n (int): the integer number
+        m (int): the modulus
+
+    Raises:
+        ValueError: n is smaller than 1.
+
+    Example:
+    >>> from limathpy import fibonacci_mod
+    >>> fibonacci_mod(10**18, 10**9 + 7)
+    470273943"""
+    if n < 1:
+        raise ValueError("n must be a positive integer")
+    return _fibonacci_pair(n - 1, m)[0]
@@ -2,6 +2,7 @@ import matplotlib.pyplot as plt
 import numpy as np
 import sympy as sp
 from sympy import symbols, Function, Eq, Derivative, dsolve, solve, init_printing, exp, log, sin, cos, tan, plot_parametric, sympify, lambdify
+from limathpy.Calculus import compiled_function
 
 # Solving ordinary differential equations.
 
@@ -274,7 +275,7 @@ def slope_field(function, N = 10, xi = -10, xf = 10):
 
     Args: 
         function (string): a string that represents a function f, such as
-        dy/dx = f(x,y).                                  
+        dy/dx = f(x,y), or a CompiledFunction in the variables 'x y'.                                  
         N (int): number of slopes to graph.
         xi = left and lower limit in the axis.
         xf = right and upper limit in the axis.
@@ -286,9 +287,7 @@ def slope_field(function, N = 10, xi = -10, xf = 10):
     .. image:: slope_field.png
       :align: center"""
     fig, ax = plt.subplots()
-    x, y = sp.symbols('x y')
-    temp = sp.sympify(function)
-    f = sp.lambdify((x, y), temp, 'numpy')
+    f = compiled_function(function, 'x y').numpy
     x = np.linspace(xi, xf, N)
     y = np.linspace(xi, xf, N)
     X, Y = np.meshgrid(x, y)
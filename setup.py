@@ -12,6 +12,5 @@ setup(name='limathpy',
                         'numpy',
                         'matplotlib',
                         'scipy',
-                        'celluloid',
                         'IPython'],
       zip_safe=False)